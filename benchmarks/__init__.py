@@ -0,0 +1,4 @@
+'''Stand-alone benchmarks for the task modules. Run them from the repository root, e.g.
+
+    python -m benchmarks.bench_sorting --sizes 10000 100000
+'''
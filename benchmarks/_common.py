@@ -0,0 +1,39 @@
+import random
+import time
+from datetime import date, timedelta
+
+from task import Task
+
+
+def make_tasks(count, seed=0, start=date(2017, 1, 1), days=365):
+    '''Generates count synthetic tasks with random levels, dates spread over the given number of days and durations
+    of up to eight hours; the same seed always produces the same tasks
+    '''
+    rng = random.Random(seed)
+    tasks = []
+    for index in range(count):
+        tasks.append(Task("Task {}".format(index),
+                          "Synthetic task {}".format(index),
+                          rng.randint(1, 10),
+                          rng.randint(1, 10),
+                          start + timedelta(days=rng.randrange(days)),
+                          timedelta(seconds=rng.randrange(8 * 3600)),
+                          timedelta(seconds=rng.randrange(8 * 3600)),
+                          rng.random() < 0.3))
+    return tasks
+
+
+def best_of(function, repeat=3):
+    '''Runs function repeat times and returns the fastest wall time in seconds'''
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(label, count, seconds, unit="ops"):
+    print("{:<56} {:>10} {:>10.4f}s {:>14,.0f} {}/s".format(label, count, seconds, count / seconds, unit))
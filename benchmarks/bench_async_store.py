@@ -0,0 +1,90 @@
+'''Load test for AsyncTaskStore: thousands of concurrent clients each run a mix of add, get, update and complete
+calls, and the p50/p99 latency of every operation is reported for the in-memory and sqlite backends. Every fourth
+task added has no task_date. After the run every task is read back from the backend to check that all writes were
+flushed and that they round-trip unchanged.
+
+    python -m benchmarks.bench_async_store --clients 2000 --operations 20
+'''
+import argparse
+import asyncio
+import random
+import time
+from datetime import date
+
+from task import Task
+from task_async import AsyncTaskStore, MemoryTaskBackend, RepositoryTaskBackend
+from task_repository import TaskRepository
+
+TODAY = date(2017, 1, 1)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def _client(store, client, operations, latencies, rng):
+    task_ids = []
+    for step in range(operations):
+        if not task_ids or rng.random() < 0.25:
+            operation = "add"
+        else:
+            operation = rng.choice(("get", "get", "update", "complete"))
+        started = time.perf_counter()
+        if operation == "add":
+            task_date = None if len(task_ids) % 4 == 3 else TODAY
+            task_ids.append(await store.add(Task("Client {} task {}".format(client, step), None, 1, 1, task_date)))
+        elif operation == "get":
+            await store.get(rng.choice(task_ids))
+        elif operation == "update":
+            await store.update(rng.choice(task_ids), priority_level=rng.randint(1, 10))
+        else:
+            await store.complete(rng.choice(task_ids))
+        latencies[operation].append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    return task_ids
+
+
+async def _run(label, backend, args):
+    latencies = {"add": [], "get": [], "update": [], "complete": []}
+    rng = random.Random(0)
+    started = time.perf_counter()
+    async with AsyncTaskStore(backend, max_latency=args.max_latency, max_batch_size=args.batch_size,
+                              cache_size=args.cache_size) as store:
+        results = await asyncio.gather(*[_client(store, client, args.operations, latencies, rng)
+                                         for client in range(args.clients)])
+        expected = {}
+        for task_ids in results:
+            for task_id in task_ids:
+                expected[task_id] = (await store.get(task_id)).toRow()
+    elapsed = time.perf_counter() - started
+
+    for task_id, row in expected.items():
+        assert backend.read(task_id).toRow() == row
+    total = sum(len(values) for values in latencies.values())
+    print("{}: {} clients, {:,} operations in {:.2f}s ({:,.0f} ops/s)".format(
+        label, args.clients, total, elapsed, total / elapsed))
+    for operation, values in latencies.items():
+        print("  {:<10} n={:<8} p50 {:>9.3f} ms  p99 {:>9.3f} ms".format(
+            operation, len(values), 1000 * _percentile(values, 0.5), 1000 * _percentile(values, 0.99)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=20)
+    parser.add_argument("--max-latency", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    asyncio.run(_run("memory", MemoryTaskBackend(), args))
+    repository = TaskRepository()
+    try:
+        asyncio.run(_run("sqlite", RepositoryTaskBackend(repository), args))
+    finally:
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
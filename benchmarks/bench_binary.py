@@ -0,0 +1,59 @@
+'''Measures writing, opening and reading a memory-mapped TaskFile against re-parsing the same tasks from JSON Lines
+with task_io, the path used at startup today
+
+    python -m benchmarks.bench_binary --size 1000000
+'''
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from task_binary import TaskFile, numpy
+from task_io import dump_tasks, load_row_chunks
+from benchmarks._common import make_tasks
+
+
+def _timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    print("{:<40} {:>10.4f}s".format(label, time.perf_counter() - started))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--reads", type=int, default=10000)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.tbin")
+        _timed("TaskFile.create", lambda: TaskFile.create(path, tasks).close())
+        print("{:<40} {:>10.1f} MB".format("record + string files",
+                                           (os.path.getsize(path) + os.path.getsize(path + ".strings")) / 1e6))
+
+        jsonl = os.path.join(directory, "tasks.jsonl")
+        dump_tasks(tasks, jsonl)
+        _timed("parse JSON Lines (load_row_chunks)", lambda: sum(len(chunk) for chunk in load_row_chunks(jsonl)))
+
+        task_file = _timed("open TaskFile", lambda: TaskFile(path))
+        assert len(task_file) == args.size
+
+        rng = random.Random(0)
+        indices = [rng.randrange(args.size) for _ in range(args.reads)]
+        _timed("{} random task reads".format(args.reads), lambda: [task_file[index] for index in indices])
+        for index in indices[:100]:
+            assert task_file[index].toRow() == tasks[index].toRow()
+
+        if numpy is not None:
+            records = task_file.asNumpy()
+            total = _timed("numpy sum of predicted_seconds", lambda: int(records["predicted_seconds"].sum()))
+            assert total == sum(task.toRow()[5] for task in tasks)
+            del records
+        task_file.close()
+
+
+if __name__ == "__main__":
+    main()
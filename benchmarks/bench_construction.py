@@ -0,0 +1,84 @@
+'''Measures construction time and memory per task for the slotted Task (through __init__ and the trusted from_row
+fast path) against a replica of the previous __dict__-based Task that stored two timedelta objects per task
+
+    python -m benchmarks.bench_construction --size 1000000
+'''
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from task import Task
+from benchmarks._common import report
+
+
+class DictTask:
+    '''Replica of the previous Task constructor: six isinstance checks and a per-instance __dict__'''
+
+    def __init__(self, name, description = None, task_difficulty_level = None, task_priority_level = None,
+                 task_date = None, predicted_time_required = timedelta(seconds=0),
+                 actual_time_required = timedelta(seconds=0), completed = False):
+        if not isinstance(predicted_time_required, timedelta) or not isinstance(actual_time_required,timedelta):
+            raise TypeError
+        if task_date and not isinstance(task_date,date):
+            raise TypeError
+        if description and not isinstance(description,str):
+            raise TypeError
+        if task_difficulty_level and not isinstance(task_difficulty_level, int):
+            raise TypeError
+        if task_priority_level and not isinstance(task_priority_level,int):
+            raise TypeError
+        if not isinstance(name,str):
+            raise TypeError
+        self.name = name
+        self.difficulty_level = task_difficulty_level
+        self.priority_level = task_priority_level
+        self.description = description
+        self.task_date = task_date
+        self.actual_time_required = actual_time_required
+        self.predicted_time_required = predicted_time_required
+        self.completed = completed
+
+
+def _measure(label, size, build):
+    '''Builds size tasks with build(index) and reports the time taken, then builds them again under tracemalloc to
+    report the memory held per task (excluding the list holding them). Names and dates are shared between the runs so
+    only the task objects and the values they own are measured.
+    '''
+    gc.collect()
+    started = time.perf_counter()
+    tasks = [build(index) for index in range(size)]
+    report(label, size, time.perf_counter() - started, "tasks")
+    del tasks
+
+    gc.collect()
+    tracemalloc.start()
+    tasks = [build(index) for index in range(size)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<56} {:>10.1f} bytes/task".format("", (current - 8 * size) / size))
+    del tasks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000000)
+    args = parser.parse_args()
+
+    names = ["Task {}".format(index % 1000) for index in range(1000)]
+    days = [date(2017, 1, 1) + timedelta(days=index) for index in range(365)]
+
+    #Each task gets its own timedelta objects, as when tasks are loaded from a database
+    _measure("dict-based Task(...)", args.size,
+             lambda i: DictTask(names[i % 1000], None, 5, 5, days[i % 365],
+                                timedelta(seconds=i % 28800), timedelta(seconds=i % 3600), False))
+    _measure("slotted Task(...)", args.size,
+             lambda i: Task(names[i % 1000], None, 5, 5, days[i % 365],
+                            timedelta(seconds=i % 28800), timedelta(seconds=i % 3600), False))
+    _measure("slotted Task.from_row(...)", args.size,
+             lambda i: Task.from_row(names[i % 1000], None, 5, 5, days[i % 365], i % 28800, i % 3600, False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+'''Compares TaskDateIndex queries (week and month windows, overdue, next N due) with list comprehensions over the
+whole task list
+
+    python -m benchmarks.bench_date_index --sizes 1000000
+'''
+import argparse
+import time
+from datetime import date, timedelta
+
+from task_date_index import TaskDateIndex
+from benchmarks._common import make_tasks, best_of, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--days", type=int, default=3650, help="number of distinct days the tasks are spread over")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = date(2017, 1, 1)
+    today = start + timedelta(days=30)
+    windows = (("week", start + timedelta(days=100), start + timedelta(days=106)),
+               ("month", start + timedelta(days=100), start + timedelta(days=130)))
+
+    for size in args.sizes:
+        tasks = make_tasks(size, days=args.days)
+        started = time.perf_counter()
+        index = TaskDateIndex(tasks)
+        report("TaskDateIndex build", size, time.perf_counter() - started, "tasks")
+
+        for label, first, last in windows:
+            expected = [task for task in tasks if first <= task.task_date <= last]
+            assert sorted(map(id, index.dueBetween(first, last))) == sorted(map(id, expected))
+            report("list comprehension {} (n={})".format(label, size), 1,
+                   best_of(lambda: [task for task in tasks if first <= task.task_date <= last], args.repeat),
+                   "queries")
+            report("TaskDateIndex.dueBetween {} (n={})".format(label, size), 1,
+                   best_of(lambda: list(index.dueBetween(first, last)), args.repeat), "queries")
+
+        expected = [task for task in tasks if task.task_date < today and not task.completed]
+        assert sorted(map(id, index.overdue(today))) == sorted(map(id, expected))
+        report("list comprehension overdue (n={})".format(size), 1,
+               best_of(lambda: [task for task in tasks if task.task_date < today and not task.completed],
+                       args.repeat), "queries")
+        report("TaskDateIndex.overdue (n={})".format(size), 1,
+               best_of(lambda: list(index.overdue(today)), args.repeat), "queries")
+
+        report("sorted comprehension next 10 due (n={})".format(size), 1,
+               best_of(lambda: sorted([task for task in tasks if task.task_date >= today and not task.completed],
+                                      key=lambda task: task.task_date)[:10], args.repeat), "queries")
+        report("TaskDateIndex.nextDue 10 (n={})".format(size), 1,
+               best_of(lambda: index.nextDue(10, today), args.repeat), "queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+'''Measures task_io throughput in records/s and MB/s (of the file on disk) for JSON Lines and CSV, plain and
+gzip-compressed, against a naive export that calls json.dumps and write once per task. Files are written to a
+temporary directory and every format is checked by loading it back.
+
+    python -m benchmarks.bench_io --size 200000
+'''
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from task_io import dump_tasks, load_tasks, load_row_chunks
+from task_table import TaskTable
+from benchmarks._common import make_tasks
+
+
+def _report(label, count, seconds, path):
+    megabytes = os.path.getsize(path) / 1e6
+    print("{:<40} {:>10.4f}s {:>12,.0f} records/s {:>8.1f} MB/s ({:.1f} MB)".format(
+        label, seconds, count / seconds, megabytes / seconds, megabytes))
+
+
+def _naiveDump(tasks, path):
+    with open(path, 'w', encoding='utf-8') as stream:
+        for task in tasks:
+            stream.write(json.dumps({'name': task.name,
+                                     'description': task.description,
+                                     'difficulty_level': task.difficulty_level,
+                                     'priority_level': task.priority_level,
+                                     'task_date': str(task.task_date),
+                                     'predicted_time_required': task.predicted_time_required.total_seconds(),
+                                     'actual_time_required': task.actual_time_required.total_seconds(),
+                                     'completed': task.completed}) + '\n')
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200000)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.size)
+    expected = [task.toRow() for task in tasks]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'naive.jsonl')
+        _, seconds = _timed(lambda: _naiveDump(tasks, path))
+        _report("naive json.dumps per task", args.size, seconds, path)
+
+        for name in ('tasks.jsonl', 'tasks.csv', 'tasks.jsonl.gz', 'tasks.csv.gz'):
+            path = os.path.join(directory, name)
+            _, seconds = _timed(lambda: dump_tasks(tasks, path, format='csv' if '.csv' in name else 'jsonl'))
+            _report("dump_tasks " + name, args.size, seconds, path)
+
+            loaded, seconds = _timed(lambda: [task.toRow() for task in load_tasks(path)])
+            assert loaded == expected
+            _report("load_tasks " + name, args.size, seconds, path)
+
+            table, seconds = _timed(lambda: TaskTable.fromRows(row for chunk in load_row_chunks(path) for row in chunk))
+            assert len(table) == args.size
+            _report("load_row_chunks -> TaskTable " + name, args.size, seconds, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+'''Measures how parallel_map_reduce scales with the number of worker processes on the nightly reports (totals by
+day, predicted-vs-actual error and overdue count), and checks every result against a single-process computation
+
+    python -m benchmarks.bench_parallel --size 1000000 --workers 1 2 4 8
+'''
+import argparse
+import os
+import time
+from datetime import date
+from functools import partial
+
+from task_parallel import (parallel_map_reduce, totals_by_day, merge_totals, estimate_error, overdue_count,
+                           add_tuples)
+from task_table import TaskTable
+from benchmarks._common import make_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    print("cpu_count: {}".format(os.cpu_count()))
+    table = TaskTable(make_tasks(args.size))
+    today = date(2017, 7, 1)
+    reports = (("totals by day", totals_by_day, merge_totals),
+               ("estimate error", estimate_error, add_tuples),
+               ("overdue count", partial(overdue_count, today=today), add_tuples))
+
+    for label, mapper, reducer in reports:
+        expected = mapper(table)
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            result = parallel_map_reduce(table, mapper, reducer, workers=workers, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - started
+            assert result == expected
+            baseline = baseline or elapsed
+            print("{:<16} workers={:<3} {:>8.3f}s {:>14,.0f} tasks/s  speedup {:.2f}x".format(
+                label, workers, elapsed, args.size / elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
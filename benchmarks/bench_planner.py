@@ -0,0 +1,56 @@
+'''Measures CapacityPlanner: a full plan of all incomplete tasks, then incremental re-plans after single-task estimate
+and date changes, compared with re-running the full plan
+
+    python -m benchmarks.bench_planner --sizes 100000 1000000
+'''
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from task_planner import CapacityPlanner
+from benchmarks._common import make_tasks, best_of, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--budget-hours", type=float, default=700.0,
+                        help="hours of work available per day (the default keeps 100k tasks within about a year)")
+    parser.add_argument("--changes", type=int, default=1000, help="number of single-task changes to re-plan")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = date(2017, 1, 1)
+    budget = timedelta(hours=args.budget_hours)
+    rng = random.Random(1)
+
+    for size in args.sizes:
+        tasks = make_tasks(size, start=start)
+        planner = CapacityPlanner(budget, start)
+        report("CapacityPlanner.plan (n={})".format(size), size,
+               best_of(lambda: planner.plan(tasks), args.repeat), "tasks")
+        print("  {} days planned, {} late, {} unscheduled".format(len(planner.schedule()), len(planner.late),
+                                                                    len(planner.unscheduled)))
+
+        planned = [task for task in tasks if not task.completed]
+        changed = [rng.choice(planned) for _ in range(args.changes)]
+        started = time.perf_counter()
+        for task in changed:
+            task.setPredictedTimeRequired(seconds=rng.randrange(8 * 3600))
+        report("re-plan after setPredictedTimeRequired (n={})".format(size), len(changed),
+               time.perf_counter() - started, "changes")
+
+        started = time.perf_counter()
+        for task in changed:
+            task_date = start + timedelta(days=rng.randrange(365))
+            task.setTaskDate(task_date.day, task_date.month, task_date.year)
+        report("re-plan after setTaskDate (n={})".format(size), len(changed),
+               time.perf_counter() - started, "changes")
+
+        report("full CapacityPlanner.plan per change (n={})".format(size), 1,
+               best_of(lambda: planner.plan(tasks), 1), "changes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+'''Measures picks per second of the highest-priority incomplete task with TaskScheduler, against the current approach
+of Task.setSortingKey(4) and re-sorting the whole list for every pick
+
+    python -m benchmarks.bench_scheduler --sizes 10000 100000 1000000
+'''
+import argparse
+import time
+
+from task import Task
+from task_scheduler import TaskScheduler
+from benchmarks._common import make_tasks, report
+
+
+def _resortPicks(tasks, picks):
+    remaining = [task for task in tasks if not task.completed]
+    Task.setSortingKey(4)
+    try:
+        for _ in range(picks):
+            remaining.sort(reverse=True)
+            remaining.pop(0)
+    finally:
+        Task.setSortingKey(0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--picks", type=int, default=10000)
+    parser.add_argument("--resort-picks", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        tasks = make_tasks(size)
+
+        started = time.perf_counter()
+        scheduler = TaskScheduler(tasks)
+        report("TaskScheduler build", size, time.perf_counter() - started, "tasks")
+
+        picks = min(args.picks, len(scheduler))
+        started = time.perf_counter()
+        for _ in range(picks):
+            scheduler.pop()
+        report("TaskScheduler pop (n={})".format(size), picks, time.perf_counter() - started, "picks")
+
+        #Reprioritise tasks still in the scheduler, then pick again through the lazily deleted entries
+        waiting = scheduler.peekTopK(picks)
+        for task in waiting:
+            task.setPriorityLevel(1)
+        started = time.perf_counter()
+        for _ in range(len(waiting)):
+            scheduler.pop()
+        report("TaskScheduler pop after reprioritising", len(waiting), time.perf_counter() - started, "picks")
+
+        started = time.perf_counter()
+        _resortPicks(tasks, args.resort_picks)
+        report("setSortingKey(4) + sort per pick (n={})".format(size), args.resort_picks,
+               time.perf_counter() - started, "picks")
+
+
+if __name__ == "__main__":
+    main()
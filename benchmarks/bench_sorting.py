@@ -0,0 +1,36 @@
+'''Compares sorting with the key-function engine (Task.sort_key / sort_tasks) against sorted() on the overloaded
+comparison operators, for every sortingKey and for a multi-column ordering
+
+    python -m benchmarks.bench_sorting --sizes 10000 100000 1000000
+'''
+import argparse
+
+from task import Task, sort_tasks
+from benchmarks._common import make_tasks, best_of, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        for sortKey, field in enumerate(Task.SORT_FIELDS):
+            Task.setSortingKey(sortKey)
+            seconds = best_of(lambda: sorted(tasks), args.repeat)
+            report("operators  {}".format(field), size, seconds, "tasks")
+            seconds = best_of(lambda: sort_tasks(tasks, by=field), args.repeat)
+            report("sort_key   {}".format(field), size, seconds, "tasks")
+            assert [Task.sort_key(field)(task) for task in sorted(tasks)] == \
+                   [Task.sort_key(field)(task) for task in sort_tasks(tasks, by=field)]
+        Task.setSortingKey(0)
+
+        by = ("-priority_level", "task_date", "predicted_time_required")
+        seconds = best_of(lambda: sort_tasks(tasks, by=by), args.repeat)
+        report("sort_key   " + ",".join(by), size, seconds, "tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+'''Measures rows per second when loading tasks into an in-memory sqlite3 database (a local stand-in for MySQL):
+
+  * per-task:   getSQLInsertStatement for every task plus one execute() round trip per row. The statement produced by
+                getSQLInsertStatement is not valid SQL, so the row itself is sent with bound parameters
+  * executemany: task_sql.bulk_insert with bound parameters
+  * multi-row:  task_sql.insert_statements, one INSERT ... VALUES (...),(...) statement per batch
+
+Every path is checked by reading the rows back.
+
+    python -m benchmarks.bench_sql_export --sizes 10000 100000 --batch-size 1000
+'''
+import argparse
+import sqlite3
+
+from task import Task
+from task_sql import PLACEHOLDERS, bulk_insert, insert_statements
+from benchmarks._common import make_tasks, best_of, report
+
+TABLE = "tasks"
+
+
+def _connect():
+    connection = sqlite3.connect(":memory:")
+    connection.execute(Task.getSQLCreateStatement(TABLE, dialect="sqlite"))
+    return connection
+
+
+def _perTask(tasks):
+    connection = _connect()
+    statement = "INSERT INTO {} ({}) VALUES ({})".format(TABLE, ",".join(Task.SQL_COLUMNS),
+                                                         ",".join([PLACEHOLDERS["sqlite"]] * len(Task.SQL_COLUMNS)))
+    for task in tasks:
+        task.getSQLInsertStatement(TABLE)
+        connection.execute(statement, task.getSQLValues("sqlite"))
+        connection.commit()
+    return connection
+
+
+def _executemany(tasks, batch_size):
+    connection = _connect()
+    bulk_insert(connection, tasks, TABLE, batch_size=batch_size, dialect="sqlite")
+    return connection
+
+
+def _multiRow(tasks, batch_size):
+    connection = _connect()
+    for statement in insert_statements(tasks, TABLE, batch_size=batch_size, dialect="sqlite"):
+        connection.execute(statement)
+    connection.commit()
+    return connection
+
+
+def _check(connection, tasks):
+    rows = connection.execute("SELECT {} FROM {} ORDER BY id".format(",".join(Task.SQL_COLUMNS), TABLE)).fetchall()
+    assert rows == [task.getSQLValues("sqlite") for task in tasks]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        for label, function in (("per-task execute", lambda: _perTask(tasks)),
+                                ("bulk_insert executemany", lambda: _executemany(tasks, args.batch_size)),
+                                ("insert_statements multi-row", lambda: _multiRow(tasks, args.batch_size))):
+            _check(function(), tasks)
+            report(label, size, best_of(function, args.repeat), "rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+'''Benchmark suite for the hot paths of task.py: Task.__init__, the six comparison operators under every sortingKey,
+__add__, getSQLInsertStatement, getSQLCreateStatement and __str__, on synthetic tasks at several scales. The
+renderings are timed both cold (caches cleared before every call) and as cache hits.
+
+Every benchmark records operations per second (best of --repeat runs) and the peak memory traced while it runs once
+more under tracemalloc. Results can be saved as a JSON baseline and later runs compared against it; the comparison
+exits with status 1 when any benchmark is slower than the baseline by more than --tolerance.
+
+    python -m benchmarks.bench_task_ops --sizes 1000 100000 --save baseline.json
+    python -m benchmarks.bench_task_ops --sizes 1000 100000 --compare baseline.json --tolerance 0.2
+'''
+import argparse
+import json
+import operator
+import platform
+import sys
+import time
+import tracemalloc
+
+from task import Task
+from benchmarks._common import make_tasks, best_of
+
+
+COMPARISONS = (('lt', operator.lt), ('gt', operator.gt), ('le', operator.le),
+               ('ge', operator.ge), ('eq', operator.eq), ('ne', operator.ne))
+
+
+def _construct(arguments):
+    for args in arguments:
+        Task(*args)
+    return len(arguments)
+
+
+def _compare(pairs, compare, sortKey):
+    with Task.ordering(sortKey):
+        for left, right in pairs:
+            compare(left, right)
+    return len(pairs)
+
+
+def _add(pairs, sortKey):
+    with Task.ordering(sortKey):
+        for left, right in pairs:
+            left + right
+    return len(pairs)
+
+
+def _insertStatements(tasks, cached):
+    for task in tasks:
+        if not cached:
+            task._sqlCache = None
+        task.getSQLInsertStatement("tasks")
+    return len(tasks)
+
+
+def _createStatements(count):
+    for _ in range(count):
+        Task.getSQLCreateStatement("tasks")
+    return count
+
+
+def _strings(tasks, cached):
+    for task in tasks:
+        if not cached:
+            task._strCache = None
+        str(task)
+    return len(tasks)
+
+
+def benchmarks(tasks):
+    '''Returns (name, function) pairs; each function performs the benchmarked operation and returns how many times'''
+    arguments = [(task.name, task.description, task.difficulty_level, task.priority_level, task.task_date,
+                  task.predicted_time_required, task.actual_time_required, task.completed) for task in tasks]
+    pairs = list(zip(tasks, tasks[1:] + tasks[:1]))
+
+    cases = [("init", lambda: _construct(arguments))]
+    for sortKey, field in enumerate(Task.SORT_FIELDS):
+        for name, compare in COMPARISONS:
+            cases.append(("{}[{}]".format(name, field),
+                          lambda compare=compare, sortKey=sortKey: _compare(pairs, compare, sortKey)))
+    for sortKey in (0, 1):
+        cases.append(("add[{}]".format(Task.SORT_FIELDS[sortKey]), lambda sortKey=sortKey: _add(pairs, sortKey)))
+    #The plain cases render every task from scratch; the [cached] cases measure hits on the rendering caches
+    cases.append(("getSQLInsertStatement", lambda: _insertStatements(tasks, False)))
+    cases.append(("getSQLInsertStatement[cached]", lambda: _insertStatements(tasks, True)))
+    cases.append(("getSQLCreateStatement", lambda: _createStatements(len(tasks))))
+    cases.append(("str", lambda: _strings(tasks, False)))
+    cases.append(("str[cached]", lambda: _strings(tasks, True)))
+    return cases
+
+
+def _peakMemory(function):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started, _ = tracemalloc.get_traced_memory()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - started
+
+
+def run(sizes, repeat, memory):
+    results = {}
+    for size in sizes:
+        tasks = make_tasks(size)
+        for name, function in benchmarks(tasks):
+            count = function()
+            seconds = best_of(function, repeat)
+            result = {"size": size, "ops": count, "seconds": seconds, "ops_per_sec": count / seconds}
+            if memory:
+                result["peak_bytes"] = _peakMemory(function)
+            key = "{}@{}".format(name, size)
+            results[key] = result
+            print("{:<48} {:>16,.0f} ops/s {:>14} peak bytes".format(key, result["ops_per_sec"],
+                                                                     "{:,}".format(result.get("peak_bytes", 0))))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    '''Prints the benchmarks that got slower than the baseline by more than tolerance and returns how many there are'''
+    regressions = 0
+    for key, result in sorted(results.items()):
+        previous = baseline["benchmarks"].get(key)
+        if previous is None:
+            continue
+        ratio = result["ops_per_sec"] / previous["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions += 1
+            print("REGRESSION {:<48} {:>16,.0f} -> {:,.0f} ops/s ({:+.0%})".format(
+                key, previous["ops_per_sec"], result["ops_per_sec"], ratio - 1))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory runs")
+    parser.add_argument("--save", help="write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare the results against this JSON baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing, e.g. 0.2")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, not args.no_memory)
+
+    if args.save:
+        with open(args.save, "w") as stream:
+            json.dump({"meta": {"python": platform.python_version(),
+                                "implementation": platform.python_implementation(),
+                                "machine": platform.machine(),
+                                "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                       "benchmarks": results}, stream, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
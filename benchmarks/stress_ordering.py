@@ -0,0 +1,85 @@
+'''Stress check for Task.ordering: many threads (and asyncio tasks) sort the same tasks at the same time, each by a
+different sortingKey, and every result is checked against the key-function ordering. Exits with status 1 on any
+mismatch.
+
+    python -m benchmarks.stress_ordering --threads 32 --rounds 20
+'''
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from task import Task
+from benchmarks._common import make_tasks
+
+
+def _isOrdered(tasks, field):
+    key = Task.sort_key(field)
+    keys = [key(task) for task in tasks]
+    return all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1))
+
+
+def _sortRounds(tasks, field, rounds, seed):
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(rounds):
+        shuffled = list(tasks)
+        rng.shuffle(shuffled)
+        with Task.ordering(field):
+            shuffled.sort()
+        if not _isOrdered(shuffled, field):
+            failures += 1
+    return failures
+
+
+async def _sortAsync(tasks, field, rounds, seed):
+    failures = 0
+    for round_index in range(rounds):
+        with Task.ordering(field):
+            await asyncio.sleep(0)  #let the other asyncio tasks run inside their own ordering blocks
+            failures += _sortRounds(tasks, field, 1, seed + round_index)
+    return failures
+
+
+async def _runAsync(tasks, workers, rounds):
+    fields = Task.SORT_FIELDS
+    results = await asyncio.gather(*[_sortAsync(tasks, fields[i % len(fields)], rounds, i) for i in range(workers)])
+    return sum(results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    #Tasks without None levels, so the operators can compare every pair
+    tasks = make_tasks(args.tasks)
+    sys.setswitchinterval(1e-6)  #force frequent thread switches in the middle of sorts
+
+    started = time.perf_counter()
+    fields = Task.SORT_FIELDS
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        futures = [executor.submit(_sortRounds, tasks, fields[i % len(fields)], args.rounds, i)
+                   for i in range(args.threads)]
+        thread_failures = sum(future.result() for future in futures)
+    print("threads: {} sorts, {} misordered, {:.2f}s".format(args.threads * args.rounds, thread_failures,
+                                                             time.perf_counter() - started))
+
+    started = time.perf_counter()
+    async_failures = asyncio.run(_runAsync(tasks, args.threads, args.rounds))
+    print("asyncio: {} sorts, {} misordered, {:.2f}s".format(args.threads * args.rounds, async_failures,
+                                                             time.perf_counter() - started))
+
+    if Task.sortingKey != 0 or Task.currentSortingKey() != 0:
+        print("class-wide sortingKey was modified")
+        sys.exit(1)
+    if thread_failures or async_failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
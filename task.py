@@ -1,6 +1,11 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
 from datetime import date,datetime,time
 
+#Per-context sortingKey set by Task.ordering; None means the class-wide Task.sortingKey applies
+_contextSortingKey = ContextVar('task_sorting_key', default=None)
+
 class Task:
     '''A task object represents a task and has stored properties that provide a name and description of task, the date on which
     the task was already completed or is expected to be completed, and boolean flag to indicate whether the task has been completed or not
@@ -8,16 +13,40 @@ class Task:
     In addition, we can sublcass Task to represent large tasks (whose completion time is a matter of hours,minutes, and seconds)
     versus small tasks (whose completion time occurs on larger time scales)
 
-
+    Tasks are slotted and keep the predicted and actual time required as whole seconds; the predicted_time_required
+    and actual_time_required properties convert them to and from timedelta objects, dropping any microseconds.
     '''
 
+    __slots__ = ('name', 'description', 'difficulty_level', 'priority_level', 'task_date',
+                 '_predicted_seconds', '_actual_seconds', 'completed', '_observers', '_strCache', '_sqlCache')
+
+    #Columns written by getSQLValues, in order
+    SQL_COLUMNS = ('name', 'description', 'difficulty_level', 'priority_level', 'task_date',
+                   'predicted_time_required', 'actual_time_required', 'completed')
+
     @classmethod
-    def getSQLCreateStatement(cls, table_name):
+    def getSQLCreateStatement(cls, table_name, dialect = 'mysql'):
         ''' Generates a MySQL Create Statement that allows for the Task class to be converted into a MySQL table, which can
       then be used with a MySQL client to create a Task table
 
+        :param dialect: 'mysql', or 'sqlite' for a table that stores the times required as integer seconds
         :return:
         '''
+        if dialect == 'sqlite':
+            return ("CREATE TABLE {} ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    "name TEXT NOT NULL, "
+                    "description TEXT NULL, "
+                    "difficulty_level INTEGER NULL, "
+                    "priority_level INTEGER NULL, "
+                    "task_date DATE NULL, "
+                    "actual_time_required INTEGER NOT NULL DEFAULT 0, "
+                    "predicted_time_required INTEGER NOT NULL DEFAULT 0, "
+                    "completed INTEGER NOT NULL DEFAULT 0"
+                    ");").format(table_name)
+        if dialect != 'mysql':
+            raise ValueError
+
         create_statement = "CREATE TABLE {} ".format(table_name)
         create_statement += "("
         create_statement += "id INT AUTO_INCREMENT,"
@@ -33,6 +62,16 @@ class Task:
         create_statement += ");"
         return create_statement
 
+    @classmethod
+    def getSQLIndexStatements(cls, table_name):
+        '''Generates the CREATE INDEX statements for the columns that task queries filter and order on
+
+        :param table_name: name of a table created with getSQLCreateStatement
+        :return: a list of SQL statements
+        '''
+        return ["CREATE INDEX {0}_{1}_idx ON {0} ({1});".format(table_name, column)
+                for column in ('task_date', 'priority_level', 'completed')]
+
     sortingKey = 0
 
     @classmethod
@@ -50,6 +89,90 @@ class Task:
 
         cls.sortingKey = sortKey
 
+    @classmethod
+    def currentSortingKey(cls):
+        '''Returns the sortingKey used by the overloaded operators in the current thread or asyncio task: the key set
+        by an enclosing Task.ordering block if there is one, otherwise the class-wide sortingKey
+        '''
+        sortKey = _contextSortingKey.get()
+        if sortKey is None:
+            return cls.sortingKey
+        return sortKey
+
+    @classmethod
+    @contextmanager
+    def ordering(cls, sortKey):
+        '''Context manager that changes the sortingKey for the current thread or asyncio task only, so concurrent
+        sorts by different criteria do not interfere with each other and need no lock around them
+
+            with Task.ordering("priority_level"):
+                tasks.sort()
+
+        :param sortKey: a sortingKey integer or a field name from SORT_FIELDS
+        '''
+        if isinstance(sortKey, str):
+            if sortKey not in cls.SORT_FIELDS:
+                raise ValueError
+            sortKey = cls.SORT_FIELDS.index(sortKey)
+        elif sortKey not in range(0,5):
+            raise ValueError
+
+        token = _contextSortingKey.set(sortKey)
+        try:
+            yield
+        finally:
+            _contextSortingKey.reset(token)
+
+    #Field compared by the overloaded operators for each sortingKey, indexed by the sortingKey value
+    SORT_FIELDS = ('actual_time_required', 'predicted_time_required', 'task_date', 'difficulty_level', 'priority_level')
+
+    @classmethod
+    def sort_key(cls, key = None):
+        '''Builds a key function for sorted()/list.sort() that turns a task into a tuple of primitive values, so that
+        sorting computes one key per task instead of dispatching through the overloaded comparison operators on
+        every comparison. Tasks whose field is None are placed after the tasks that have a value for that field.
+
+        :param key: a sortingKey integer, a field name from SORT_FIELDS, or a sequence of them for multi-column
+                    ordering; a field name prefixed with '-' orders that column in descending order, e.g.
+                    ('-priority_level', 'task_date', 'predicted_time_required'). Defaults to
+                    Task.currentSortingKey()
+        :return: a function mapping a task to its sort key tuple
+        '''
+        if key is None:
+            key = cls.currentSortingKey()
+        if isinstance(key, (int, str)):
+            key = (key,)
+
+        columns = []
+        for column in key:
+            descending = False
+            if isinstance(column, int):
+                if column not in range(0,5):
+                    raise ValueError
+                column = cls.SORT_FIELDS[column]
+            elif isinstance(column, str):
+                if column.startswith('-'):
+                    descending = True
+                    column = column[1:]
+                if column not in cls.SORT_FIELDS:
+                    raise ValueError
+            else:
+                raise TypeError
+            attribute, convert = _SORT_ATTRIBUTES[column]
+            columns.append((attribute, convert, -1 if descending else 1))
+
+        def key_function(task):
+            values = []
+            for attribute, convert, sign in columns:
+                value = getattr(task, attribute)
+                if value is None:
+                    values += (1, 0)
+                else:
+                    values += (0, sign * convert(value))
+            return tuple(values)
+
+        return key_function
+
     def __init__(self, name, description = None,
                  task_difficulty_level = None,
                  task_priority_level = None,
@@ -60,7 +183,7 @@ class Task:
         if not isinstance(predicted_time_required, timedelta) or not isinstance(actual_time_required,timedelta):
             raise TypeError
 
-        if task_date and not isinstance(task_date,datetime.date):
+        if task_date and not isinstance(task_date,date):
             raise TypeError
 
         if description and not isinstance(description,str):
@@ -80,43 +203,129 @@ class Task:
         self.priority_level = task_priority_level
         self.description = description
         self.task_date = task_date
-        self.actual_time_required = actual_time_required
-        self.predicted_time_required = predicted_time_required
+        self._actual_seconds = actual_time_required.days * 86400 + actual_time_required.seconds
+        self._predicted_seconds = predicted_time_required.days * 86400 + predicted_time_required.seconds
         self.completed = completed
+        self._observers = None
+        self._strCache = None
+        self._sqlCache = None
+
+    @classmethod
+    def from_row(cls, name, description, difficulty_level, priority_level, task_date,
+                 predicted_seconds, actual_seconds, completed):
+        '''Trusted fast-path constructor for values that have already been validated, e.g. rows read back from a
+        database or a TaskTable; no type checks are made. The arguments follow the layout returned by toRow.
+
+        :param predicted_seconds: predicted time required as an integer number of seconds
+        :param actual_seconds: actual time required as an integer number of seconds
+        :return: a new Task
+        '''
+        task = cls.__new__(cls)
+        task.name = name
+        task.description = description
+        task.difficulty_level = difficulty_level
+        task.priority_level = priority_level
+        task.task_date = task_date
+        task._predicted_seconds = predicted_seconds
+        task._actual_seconds = actual_seconds
+        task.completed = completed
+        task._observers = None
+        task._strCache = None
+        task._sqlCache = None
+        return task
+
+    def toRow(self):
+        '''Returns the task's fields as a tuple (name, description, difficulty_level, priority_level, task_date,
+        predicted_seconds, actual_seconds, completed), the layout accepted by from_row
+        '''
+        return (self.name, self.description, self.difficulty_level, self.priority_level, self.task_date,
+                self._predicted_seconds, self._actual_seconds, self.completed)
+
+    def __reduce__(self):
+        #Pickle the plain row only, never the registered observers
+        return (self.__class__.from_row, self.toRow())
+
+    @property
+    def predicted_time_required(self):
+        return timedelta(seconds=self._predicted_seconds)
+
+    @predicted_time_required.setter
+    def predicted_time_required(self, time_required):
+        if not isinstance(time_required, timedelta):
+            raise TypeError
+        self._predicted_seconds = time_required.days * 86400 + time_required.seconds
+        self._strCache = self._sqlCache = None
+
+    @property
+    def actual_time_required(self):
+        return timedelta(seconds=self._actual_seconds)
+
+    @actual_time_required.setter
+    def actual_time_required(self, time_required):
+        if not isinstance(time_required, timedelta):
+            raise TypeError
+        self._actual_seconds = time_required.days * 86400 + time_required.seconds
+        self._strCache = self._sqlCache = None
+
+    def addObserver(self, observer):
+        '''Registers a callable observer(task, attribute) that is called after a setter method or toggleCompletion
+        changes the task; attribute is the name of the field that changed. Assigning to the attributes directly does
+        not notify observers.
+        '''
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(observer)
+
+    def removeObserver(self, observer):
+        if self._observers:
+            self._observers.remove(observer)
+
+    def _changed(self, attribute):
+        self._strCache = self._sqlCache = None
+        if self._observers:
+            for observer in list(self._observers):
+                observer(self, attribute)
 
     #define the setter methods for task attributes
     def setPriorityLevel(self,priority_level):
         if not isinstance(priority_level,int):
             raise TypeError
         self.priority_level = priority_level
+        self._changed('priority_level')
 
     def setDifficultyLevel(self,difficulty_level):
         if not isinstance(difficulty_level,int):
             raise TypeError
         self.difficulty_level = difficulty_level
+        self._changed('difficulty_level')
 
     def setDescription(self,task_description):
         if not isinstance(task_description,str):
             raise TypeError
         self.description = task_description
+        self._changed('description')
 
     def setTaskDate(self,day=0,month=0,year=0):
         if not isinstance(day,int) or not isinstance(month,int) or not isinstance(year,int):
             raise TypeError
-        self.task_date = datetime.date(year=year,month=month,day=day)
+        self.task_date = date(year=year,month=month,day=day)
+        self._changed('task_date')
 
     def setPredictedTimeRequired(self,seconds = 0, minutes = 0, hours = 0):
         if not isinstance(seconds,int) or not isinstance(minutes,int) or not isinstance(hours,int):
             raise TypeError
-        self.predicted_time_required = timedelta(seconds=seconds,minutes=minutes,hours=hours)
+        self._predicted_seconds = seconds + 60 * minutes + 3600 * hours
+        self._changed('predicted_time_required')
 
     def setActualTimeRequired(self,seconds=0,minutes=0,hours=0):
         if not isinstance(seconds, int) or not isinstance(minutes, int) or not isinstance(hours, int):
             raise TypeError
-        self.actual_time_required = timedelta(seconds=seconds,minutes=minutes,hours=hours)
+        self._actual_seconds = seconds + 60 * minutes + 3600 * hours
+        self._changed('actual_time_required')
 
     def toggleCompletion(self):
         self.completed = not self.completed
+        self._changed('completed')
 
     #Overloaded arithmetic operators
 
@@ -130,36 +339,37 @@ class Task:
         '''
 
         #The sortingKey must be 0 or 1 in order for arithmetic addition to make sense
-        if Task.sortingKey not in range(0,2):
+        sortingKey = Task.currentSortingKey()
+        if sortingKey not in range(0,2):
                 raise TypeError
 
-        if Task.sortingKey == 0:
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required + other.actual_time_required #returns a timedelta object
             if isinstance(other, (float, int)):
                 return self.actual_time_required + other.actual_time_required.total_seconds() #returns an integer in seconds
             if isinstance(other, timedelta):
                 return self.actual_time_required + other.actual_time_required #returns a timedelta object
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required + other.predicted_time_required #returns a timedelta
             if isinstance(other, (float, int)):
                 return self.predicted_time_required + other.predicted_time_required.total_seconds() #returns an integer
             if isinstance(other, timedelta):
                 return self.predicted_time_required + other.predicted_time_required #returns a timedelta
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 raise NotImplemented
             elif isinstance(other, Task):
                 raise NotImplemented
             else:
                 raise NotImplemented
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 raise NotImplementedError
             elif isinstance(other, (float, int)):
                 raise NotImplementedError
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 raise NotImplemented
             elif isinstance(other, (float, int)):
@@ -168,186 +378,192 @@ class Task:
     #Overloaded relational operators for task objects
 
     def __gt__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required > other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required > other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required > other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required > other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required > other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required > other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date > other
             elif isinstance(other, Task):
                 return self.task_date > other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level > other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level > other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level > other.priority_level
             elif isinstance(other, (float,int)):
                 return self.priority_level > other.priority_level
 
     def __lt__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required < other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required < other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required < other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required < other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required < other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required < other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date < other
             elif isinstance(other, Task):
                 return self.task_date < other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level < other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level < other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level < other.priority_level
             elif isinstance(other, (float,int)):
                 return self.priority_level < other.priority_level
 
     def __ge__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required >= other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required >= other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required >= other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required >= other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required >= other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required >= other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date >= other
             elif isinstance(other, Task):
                 return self.task_date >= other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level >= other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level >= other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level >= other.priority_level
             elif isinstance(other, (float,int)):
                 return self.priority_level >= other.priority_level
 
     def __le__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required >= other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required >= other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required >= other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required >= other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required >= other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required >= other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date >= other
             elif isinstance(other, Task):
                 return self.task_date >= other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level >= other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level >= other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level >= other.priority_level
             elif isinstance(other, (float,int)):
                 return self.priority_level >= other.priority_level
 
     def __eq__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required == other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required == other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required == other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required == other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required == other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required == other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date == other
             elif isinstance(other, Task):
                 return self.task_date == other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level == other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level == other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level == other.priority_level
             elif isinstance(other, (float,int)):
                 return self.priority_level == other.priority_level
 
     def __ne__(self, other):
-        if Task.sortingKey == 0:
+        sortingKey = Task.currentSortingKey()
+        if sortingKey == 0:
             if isinstance(other, Task):
                 return self.actual_time_required != other.actual_time_required
             if isinstance(other, (float,int)):
                 return self.actual_time_required != other.actual_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.actual_time_required != other.actual_time_required
-        elif Task.sortingKey == 1:
+        elif sortingKey == 1:
             if isinstance(other, Task):
                 return self.predicted_time_required != other.predicted_time_required
             if isinstance(other, (float,int)):
                 return self.predicted_time_required != other.predicted_time_required.total_seconds()
             if isinstance(other, timedelta):
                 return self.predicted_time_required != other.predicted_time_required
-        elif Task.sortingKey == 2:
-            if isinstance(other, datetime.date):
+        elif sortingKey == 2:
+            if isinstance(other, date):
                 return self.task_date != other
             elif isinstance(other, Task):
                 return self.task_date != other.task_date
-        elif Task.sortingKey == 3:
+        elif sortingKey == 3:
             if isinstance(other, Task):
                 return self.difficulty_level != other.difficulty_level
             elif isinstance(other,(float,int)):
                 return self.difficulty_level != other
-        elif Task.sortingKey == 4:
+        elif sortingKey == 4:
             if isinstance(other, Task):
                 return self.priority_level != other.priority_level
             elif isinstance(other, (float,int)):
@@ -355,75 +571,140 @@ class Task:
 
     def getSQLInsertStatement(self, table_name):
         '''Converts a task object into a SQL insert statement in order to allow for easy interfacing with MySQL
-        clients and shells
+        clients and shells. The statement is cached together with the field values it was rendered from, so it is
+        rebuilt whenever a field changes, whether through a setter method or by direct assignment.
 
         :param      table_name: Name of MySQL table into which the task object will loaded
         :return:    SQLInsertStatement: a MySQL InsertStatement that allows for task object data to be stored in a
                     MySQL database
         '''
-        insert_statement = "INSERT INTO {}".format(table_name)
-        insert_statement += "(name,"
-        if self.description:
-            insert_statement += "description,"
-
-        if self.difficulty_level:
-            insert_statement += "difficulty_level,"
-
-        if self.priority_level:
-            insert_statement += "priority_level,"
-
-        #insert attributes here
-        insert_statement += ")"
-
-        insert_statement += "VALUES ("
-        insert_statement += self.name + ","
-
-        if self.description:
-            insert_statement += self.description + ","
-
-        if self.difficulty_level:
-            insert_statement +=  str(self.difficulty_level) + ","
-
-        if self.priority_level:
-            insert_statement += str(self.priority_level)  + ","
-
-        insert_statement += str(self.task_date) + ","
-        insert_statement += str(self.predicted_time_required) + "," #default value for predicted time required is 00:00:00
-        insert_statement += str(self.actual_time_required) + "," #efault value for actual time required is 00:00:00
-        insert_statement += str(self.completed)
-        #insert values here
-        insert_statement += ");"
+        row = self.toRow()
+        cached = self._sqlCache
+        if cached is not None and cached[0] == table_name and cached[1] == row:
+            return cached[2]
+        insert_statement = "".join(self._sqlInsertParts(table_name))
+        self._sqlCache = (table_name, row, insert_statement)
         return insert_statement
 
-    def __str__(self):
-        output_str = "Task Name: {}".format(self.name)
-        if self.description:
-            output_str += "Task Description: {}".format(self.description)
-        if self.difficulty_level:
-            output_str += "Difficult Level: {}".format(str(self.difficulty_level))
-        if self.priority_level:
-            output_str += "Priority Level: {}".format(str(self.priority_level))
-        output_str += "Task Date: {}".format(self.task_date)
-        output_str += "Actual Time Required: {}".format(self.actual_time_required)
-        output_str += "Predicted Time Required: {}".format(self.predicted_time_required)
-        status = ""
-        if self.completed:
-            status = "True"
+    def writeSQLInsert(self, stream, table_name):
+        '''Writes getSQLInsertStatement(table_name) to a text stream; when the statement is not cached its pieces are
+        written directly, without building the statement as one string
+        '''
+        cached = self._sqlCache
+        if cached is not None and cached[0] == table_name and cached[1] == self.toRow():
+            stream.write(cached[2])
         else:
-            status = "False"
-        output_str += "Completion Status: {}".format(self.completed)
+            stream.writelines(self._sqlInsertParts(table_name))
+
+    def _sqlInsertParts(self, table_name):
+        description = self.description
+        difficulty_level = self.difficulty_level
+        priority_level = self.priority_level
+        #default value for predicted and actual time required is 00:00:00
+        return ("INSERT INTO ", table_name,
+                "(name,",
+                "description," if description else "",
+                "difficulty_level," if difficulty_level else "",
+                "priority_level," if priority_level else "",
+                ")VALUES (", self.name, ",",
+                description + "," if description else "",
+                str(difficulty_level) + "," if difficulty_level else "",
+                str(priority_level) + "," if priority_level else "",
+                str(self.task_date), ",",
+                str(self.predicted_time_required), ",",
+                str(self.actual_time_required), ",",
+                str(self.completed), ");")
+
+    def getSQLValues(self, dialect = 'mysql'):
+        '''Returns the task's values in SQL_COLUMNS order, ready to be passed as bound parameters to a DB-API cursor
+
+        :param dialect: 'mysql' renders the times required as H:MM:SS strings, 'sqlite' as integer seconds
+        :return: a tuple of column values
+        '''
+        predicted_seconds = self._predicted_seconds
+        actual_seconds = self._actual_seconds
+        if dialect == 'mysql':
+            predicted_seconds = _formatSQLTime(predicted_seconds)
+            actual_seconds = _formatSQLTime(actual_seconds)
+        elif dialect != 'sqlite':
+            raise ValueError
+        return (self.name,
+                self.description,
+                self.difficulty_level,
+                self.priority_level,
+                None if self.task_date is None else self.task_date.isoformat(),
+                predicted_seconds,
+                actual_seconds,
+                1 if self.completed else 0)
+
+    def __str__(self):
+        row = self.toRow()
+        cached = self._strCache
+        if cached is not None and cached[0] == row:
+            return cached[1]
+        output_str = "".join(self._strParts())
+        self._strCache = (row, output_str)
         return output_str
 
+    def writeStr(self, stream):
+        '''Writes str(self) to a text stream; when the rendering is not cached its pieces are written directly,
+        without building the rendering as one string
+        '''
+        cached = self._strCache
+        if cached is not None and cached[0] == self.toRow():
+            stream.write(cached[1])
+        else:
+            stream.writelines(self._strParts())
+
+    def _strParts(self):
+        description = self.description
+        difficulty_level = self.difficulty_level
+        priority_level = self.priority_level
+        return ("Task Name: ", str(self.name),
+                "Task Description: " + str(description) if description else "",
+                "Difficult Level: " + str(difficulty_level) if difficulty_level else "",
+                "Priority Level: " + str(priority_level) if priority_level else "",
+                "Task Date: ", str(self.task_date),
+                "Actual Time Required: ", str(self.actual_time_required),
+                "Predicted Time Required: ", str(self.predicted_time_required),
+                "Completion Status: ", str(self.completed))
+
     def __repr__(self):
         return self.__str__()
 
+#Attribute read for each sortable field and its conversion into a primitive value, used by Task.sort_key
+_SORT_ATTRIBUTES = {
+    'actual_time_required': ('_actual_seconds', int),
+    'predicted_time_required': ('_predicted_seconds', int),
+    'task_date': ('task_date', date.toordinal),
+    'difficulty_level': ('difficulty_level', int),
+    'priority_level': ('priority_level', int),
+}
+
+def _formatSQLTime(seconds):
+    '''Formats a number of seconds as a MySQL TIME literal, which allows more than 24 hours and negative values'''
+    sign = "-" if seconds < 0 else ""
+    minutes, seconds = divmod(abs(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}{}:{:02d}:{:02d}".format(sign, hours, minutes, seconds)
+
+def sort_tasks(tasks, by = None, reverse = False):
+    '''Returns a new list of tasks ordered by the given key, see Task.sort_key for the accepted values of by
+
+    :param tasks: an iterable of Task objects
+    :param by: a sortingKey integer, a field name, or a sequence of field names (prefix '-' for descending)
+    :param reverse: reverse the whole ordering
+    :return: a sorted list of tasks
+    '''
+    return sorted(tasks, key=Task.sort_key(by), reverse=reverse)
+
 if __name__ == '__main__':
     task1 = Task("Do laundry",
                  "Wash and dry all whites, towels, and bedding in separate washes; "
                  "use bleach on whites, low-heat or no heat for delicates",
                 5,      #difficulty_level
                 5,     #priority_level
-                datetime.date(year=2017,month=1,day=20),
-                datetime.time(hours=1,minutes=30,seconds=0),
-                datetime.time(hours=0,minutes=0,seconds=0),
+                date(year=2017,month=1,day=20),
+                timedelta(hours=1,minutes=30,seconds=0),
+                timedelta(hours=0,minutes=0,seconds=0),
                 False)  #completion_status
\ No newline at end of file
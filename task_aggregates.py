@@ -0,0 +1,130 @@
+from datetime import timedelta
+from math import sqrt
+
+from task import Task
+
+
+class TimeStatistics:
+    '''Running totals of the predicted and actual time required by a group of tasks, and of the estimate error
+    (actual minus predicted, in seconds) used to derive the mean error, mean absolute error and root mean square error
+    '''
+
+    __slots__ = ('count', 'predicted_seconds', 'actual_seconds', 'error_sum', 'absolute_error_sum',
+                 'squared_error_sum')
+
+    def __init__(self):
+        self.count = 0
+        self.predicted_seconds = 0
+        self.actual_seconds = 0
+        self.error_sum = 0
+        self.absolute_error_sum = 0
+        self.squared_error_sum = 0
+
+    def _update(self, predicted_seconds, actual_seconds, sign):
+        error = actual_seconds - predicted_seconds
+        self.count += sign
+        self.predicted_seconds += sign * predicted_seconds
+        self.actual_seconds += sign * actual_seconds
+        self.error_sum += sign * error
+        self.absolute_error_sum += sign * abs(error)
+        self.squared_error_sum += sign * error * error
+
+    @property
+    def total_predicted_time(self):
+        return timedelta(seconds=self.predicted_seconds)
+
+    @property
+    def total_actual_time(self):
+        return timedelta(seconds=self.actual_seconds)
+
+    @property
+    def mean_error(self):
+        '''Average of actual minus predicted seconds; positive when tasks take longer than predicted'''
+        return self.error_sum / self.count if self.count else 0.0
+
+    @property
+    def mean_absolute_error(self):
+        return self.absolute_error_sum / self.count if self.count else 0.0
+
+    @property
+    def root_mean_square_error(self):
+        return sqrt(self.squared_error_sum / self.count) if self.count else 0.0
+
+    def __repr__(self):
+        return "TimeStatistics(count={}, predicted={}, actual={}, mean_error={:.1f}s)".format(
+            self.count, self.total_predicted_time, self.total_actual_time, self.mean_error)
+
+
+class TaskAggregator:
+    '''A TaskAggregator keeps running TimeStatistics for a collection of tasks: overall, per task_date, per
+    priority_level and per completion state. Adding or removing a task updates four groups in O(1), and the aggregator
+    observes its tasks so that setPredictedTimeRequired, setActualTimeRequired, setTaskDate, setPriorityLevel and
+    toggleCompletion move the task's contribution without rescanning the collection.
+    '''
+
+    _AGGREGATED_ATTRIBUTES = ('predicted_time_required', 'actual_time_required', 'task_date', 'priority_level',
+                              'completed')
+
+    def __init__(self, tasks=()):
+        self.total = TimeStatistics()
+        self.byDay = {}
+        self.byPriority = {}
+        self.byCompletion = {}
+        self._contributions = {}    #id(task) -> (task, task_date, priority_level, completed, predicted, actual)
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self):
+        return len(self._contributions)
+
+    def __contains__(self, task):
+        return id(task) in self._contributions
+
+    def add(self, task):
+        if not isinstance(task, Task):
+            raise TypeError
+        if id(task) in self._contributions:
+            raise ValueError
+        self._apply(task, 1)
+        task.addObserver(self._onTaskChanged)
+
+    def remove(self, task):
+        if id(task) not in self._contributions:
+            raise KeyError(task.name)
+        self._retract(task)
+        task.removeObserver(self._onTaskChanged)
+
+    def day(self, task_date):
+        return self.byDay.get(task_date) or TimeStatistics()
+
+    def priority(self, priority_level):
+        return self.byPriority.get(priority_level) or TimeStatistics()
+
+    def completion(self, completed):
+        return self.byCompletion.get(bool(completed)) or TimeStatistics()
+
+    def _apply(self, task, sign):
+        name, description, difficulty_level, priority_level, task_date, predicted, actual, completed = task.toRow()
+        contribution = (task, task_date, priority_level, bool(completed), predicted, actual)
+        self._contributions[id(task)] = contribution
+        self._update(contribution, sign)
+
+    def _retract(self, task):
+        self._update(self._contributions.pop(id(task)), -1)
+
+    def _update(self, contribution, sign):
+        task, task_date, priority_level, completed, predicted, actual = contribution
+        self.total._update(predicted, actual, sign)
+        for groups, key in ((self.byDay, task_date), (self.byPriority, priority_level),
+                            (self.byCompletion, completed)):
+            statistics = groups.get(key)
+            if statistics is None:
+                statistics = groups[key] = TimeStatistics()
+            statistics._update(predicted, actual, sign)
+            if not statistics.count:
+                del groups[key]
+
+    def _onTaskChanged(self, task, attribute):
+        if attribute in self._AGGREGATED_ATTRIBUTES:
+            self._retract(task)
+            self._apply(task, 1)
@@ -0,0 +1,329 @@
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+
+from task import Task
+
+_log = logging.getLogger(__name__)
+
+
+class MemoryTaskBackend:
+    '''In-process backing store for AsyncTaskStore that keeps one Task.toRow tuple per task id'''
+
+    def __init__(self):
+        self._rows = {}
+
+    def maxId(self):
+        return max(self._rows, default=0)
+
+    def writeBatch(self, items):
+        '''Stores a batch of (task id, row) pairs'''
+        self._rows.update(items)
+
+    def read(self, task_id):
+        row = self._rows.get(task_id)
+        return None if row is None else Task.from_row(*row)
+
+    def scan(self):
+        '''Yields (task id, task) pairs for every stored task'''
+        for task_id, row in list(self._rows.items()):
+            yield task_id, Task.from_row(*row)
+
+
+class RepositoryTaskBackend:
+    '''Backing store for AsyncTaskStore that writes to a TaskRepository, using the task ids as row ids'''
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    def maxId(self):
+        return self.repository.maxId()
+
+    def writeBatch(self, items):
+        self.repository.put((task_id, Task.from_row(*row)) for task_id, row in items)
+
+    def read(self, task_id):
+        return self.repository.get(task_id)
+
+    def scan(self):
+        return self.repository.items()
+
+
+class AsyncTaskStore:
+    '''An AsyncTaskStore exposes task CRUD as coroutines on top of a synchronous backend (MemoryTaskBackend or
+    RepositoryTaskBackend). Writes are acknowledged as soon as they are applied in memory and are flushed to the
+    backend in batches, at the latest max_latency seconds after the first pending write or as soon as max_batch_size
+    tasks are pending. Backend calls run in a worker thread so they never block the event loop. Recently used tasks
+    are served from an in-process LRU cache.
+
+    Use the store as an async context manager, or call start() and close(); close() flushes pending writes.
+
+        async with AsyncTaskStore(MemoryTaskBackend()) as store:
+            task_id = await store.add(Task("Do laundry"))
+            await store.update(task_id, priority_level=5)
+            await store.complete(task_id)
+
+    Tasks returned by get and query are the store's cached objects: change them through update and complete, since
+    calling their setters directly does not schedule a write.
+
+    When the backend fails to write a batch, its tasks are written one at a time so that the others still reach the
+    backend. A task whose write fails is retried on later flushes, the background flusher backing off from
+    retry_delay seconds; after max_attempts failures in a row it is dropped, logged, and recorded in failed.
+    '''
+
+    #Upper bound of the background flusher's back-off, in seconds
+    MAX_RETRY_DELAY = 5.0
+
+    def __init__(self, backend, max_latency = 0.05, max_batch_size = 500, cache_size = 10000, max_attempts = 3,
+                 retry_delay = 0.1):
+        if max_latency <= 0 or max_batch_size < 1 or cache_size < 0 or max_attempts < 1 or retry_delay < 0:
+            raise ValueError
+        self.backend = backend
+        self.max_latency = max_latency
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.failed = {}                #task id -> exception, for tasks dropped after max_attempts failed writes
+        self._cache = OrderedDict()     #task id -> Task, least recently used first
+        self._dirty = {}                #task id -> Task waiting to be flushed
+        self._flushing = {}             #task id -> Task in the batch being written
+        self._attempts = {}             #task id -> number of failed writes in a row
+        self._ids = None
+        self._pending = None
+        self._full = None
+        self._flushLock = None
+        self._flusher = None
+
+    async def start(self):
+        self._ids = itertools.count(await asyncio.to_thread(self.backend.maxId) + 1)
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flushLock = asyncio.Lock()
+        self._flusher = asyncio.create_task(self._flushLoop())
+
+    async def close(self):
+        '''Stops the background flusher, waiting for a batch it is writing, and flushes pending writes, retrying
+        failed ones until they are written or dropped after max_attempts
+        '''
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        while True:
+            try:
+                await self.flush()
+                return
+            except Exception:
+                #Every failed flush counts an attempt against the failing tasks, so this ends once they are dropped
+                _log.warning("flush failed while closing AsyncTaskStore, retrying", exc_info=True)
+                await asyncio.sleep(self.retry_delay)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    #CRUD
+
+    async def add(self, task):
+        '''Adds a task and returns its new task id'''
+        if not isinstance(task, Task):
+            raise TypeError
+        task_id = next(self._ids)
+        self._remember(task_id, task)
+        self._markDirty(task_id, task)
+        return task_id
+
+    async def get(self, task_id):
+        '''Returns the task stored under task_id
+
+        :raises KeyError: if there is no such task
+        '''
+        task = self._cache.get(task_id)
+        if task is not None:
+            self._cache.move_to_end(task_id)
+            return task
+        task = self._dirty.get(task_id) or self._flushing.get(task_id)
+        if task is None:
+            task = await asyncio.to_thread(self.backend.read, task_id)
+            #Another coroutine may have loaded or changed the task while the backend was being read
+            task = self._cache.get(task_id) or self._dirty.get(task_id) or self._flushing.get(task_id) or task
+            if task is None:
+                raise KeyError(task_id)
+        self._remember(task_id, task)
+        return task
+
+    async def update(self, task_id, **changes):
+        '''Changes fields of a task through its setter methods and schedules it to be written
+
+        :param changes: any of priority_level, difficulty_level, description, task_date (a date),
+                        predicted_time_required and actual_time_required (timedelta objects), completed
+        :return: the updated task
+        '''
+        unknown = set(changes) - set(_SETTERS)
+        if unknown:
+            raise TypeError('unknown task fields: {}'.format(', '.join(sorted(unknown))))
+        task = await self.get(task_id)
+        for field, value in changes.items():
+            _SETTERS[field](task, value)
+        self._markDirty(task_id, task)
+        return task
+
+    async def complete(self, task_id):
+        '''Marks a task as completed'''
+        return await self.update(task_id, completed=True)
+
+    async def query(self, predicate = None):
+        '''Returns (task id, task) pairs for every task matching predicate, a function of a task; pending writes are
+        flushed first so the backend scan sees them
+        '''
+        await self.flush()
+        pairs = await asyncio.to_thread(lambda: list(self.backend.scan()))
+        results = []
+        for task_id, task in pairs:
+            task = self._cache.get(task_id) or task
+            if predicate is None or predicate(task):
+                results.append((task_id, task))
+        return results
+
+    #Write batching
+
+    async def flush(self):
+        '''Writes every pending task to the backend, in batches of at most max_batch_size
+
+        :raises Exception: the last backend error, once every batch has been tried, if some tasks could not be
+                           written; those that have not used up max_attempts are pending again
+        '''
+        if self._flushLock is None:
+            return  #never started, so nothing can be pending
+        async with self._flushLock:
+            retry = {}
+            error = None
+            cancelled = False
+            while self._dirty and not cancelled:
+                batch = dict(itertools.islice(self._dirty.items(), self.max_batch_size))
+                for task_id in batch:
+                    del self._dirty[task_id]
+                rows = [(task_id, task.toRow()) for task_id, task in batch.items()]
+                self._flushing = batch
+                write = asyncio.ensure_future(asyncio.to_thread(self._writeRows, rows))
+                while not write.done():
+                    try:
+                        await asyncio.shield(write)
+                    except asyncio.CancelledError:
+                        #Never abandon a write in progress: wait for its outcome, then stop after this batch
+                        cancelled = True
+                self._flushing = {}
+                if write.cancelled() or write.exception() is not None:
+                    #The outcome of the write is unknown: put back the tasks that were not changed again meanwhile
+                    for task_id, task in batch.items():
+                        self._dirty.setdefault(task_id, task)
+                    if write.cancelled():
+                        raise asyncio.CancelledError
+                    raise write.exception()
+                failures = write.result()
+                for task_id in batch:
+                    if task_id not in failures:
+                        self._attempts.pop(task_id, None)
+                for task_id, error in failures.items():
+                    attempts = self._attempts.get(task_id, 0) + 1
+                    if attempts < self.max_attempts:
+                        self._attempts[task_id] = attempts
+                        retry[task_id] = batch[task_id]
+                    else:
+                        del self._attempts[task_id]
+                        self.failed[task_id] = error
+                        _log.error("dropping task %s after %d failed writes: %r", task_id, attempts, error)
+            for task_id, task in retry.items():
+                self._dirty.setdefault(task_id, task)
+            if cancelled:
+                raise asyncio.CancelledError
+            if retry:
+                raise error
+            self._pending.clear()
+            self._full.clear()
+
+    def _writeRows(self, rows):
+        '''Writes rows to the backend in one batch; when the batch fails, writes them one at a time so that the rows
+        the backend accepts are not held back by those it rejects
+
+        :return: {task id: exception} for the rows that could not be written
+        '''
+        try:
+            self.backend.writeBatch(rows)
+            return {}
+        except Exception:
+            pass
+        failures = {}
+        for task_id, row in rows:
+            try:
+                self.backend.writeBatch([(task_id, row)])
+            except Exception as error:
+                failures[task_id] = error
+        return failures
+
+    async def _flushLoop(self):
+        delay = self.retry_delay
+        while True:
+            await self._pending.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_latency)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                _log.warning("background flush of AsyncTaskStore failed, retrying in %.2fs", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, self.MAX_RETRY_DELAY)
+            else:
+                delay = self.retry_delay
+
+    def _markDirty(self, task_id, task):
+        self._dirty[task_id] = task
+        self._pending.set()
+        if len(self._dirty) >= self.max_batch_size:
+            self._full.set()
+
+    def _remember(self, task_id, task):
+        cache = self._cache
+        cache[task_id] = task
+        cache.move_to_end(task_id)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+
+def _setTaskDate(task, task_date):
+    task.setTaskDate(task_date.day, task_date.month, task_date.year)
+
+
+def _setCompleted(task, completed):
+    if bool(task.completed) != bool(completed):
+        task.toggleCompletion()
+
+
+def _seconds(time_required):
+    if not isinstance(time_required, timedelta):
+        raise TypeError
+    return time_required.days * 86400 + time_required.seconds
+
+
+#Setter used by AsyncTaskStore.update for each field; methods are looked up on the task at call time, so that
+#wrappers installed later on Task (e.g. by task_profiling) are used
+_SETTERS = {
+    'priority_level': lambda task, value: task.setPriorityLevel(value),
+    'difficulty_level': lambda task, value: task.setDifficultyLevel(value),
+    'description': lambda task, value: task.setDescription(value),
+    'task_date': _setTaskDate,
+    'predicted_time_required': lambda task, value: task.setPredictedTimeRequired(seconds=_seconds(value)),
+    'actual_time_required': lambda task, value: task.setActualTimeRequired(seconds=_seconds(value)),
+    'completed': _setCompleted,
+}
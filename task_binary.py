@@ -0,0 +1,169 @@
+import mmap
+import os
+import struct
+from datetime import date
+
+from task import Task
+from task_table import TaskTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+#File layout: a 16 byte header followed by fixed-width records; names and descriptions are UTF-8 strings stored in a
+#separate heap file (path + '.strings') and referenced from the records by offset and length
+MAGIC = b'TASKREC1'
+HEADER = struct.Struct('<8sII')         #magic, record size, reserved
+RECORD = struct.Struct('<qqQQIiibbBx')  #48 bytes, see RECORD_FIELDS
+RECORD_FIELDS = ('predicted_seconds', 'actual_seconds', 'name_offset', 'description_offset', 'name_length',
+                 'description_length', 'task_date', 'difficulty_level', 'priority_level', 'completed')
+
+#None is stored as the TaskTable sentinels; a description_length of -1 means no description
+NULL_LEVEL = TaskTable.NULL_LEVEL
+NULL_DATE = TaskTable.NULL_DATE
+
+if numpy is not None:
+    RECORD_DTYPE = numpy.dtype([('predicted_seconds', '<i8'), ('actual_seconds', '<i8'),
+                                ('name_offset', '<u8'), ('description_offset', '<u8'),
+                                ('name_length', '<u4'), ('description_length', '<i4'), ('task_date', '<i4'),
+                                ('difficulty_level', 'i1'), ('priority_level', 'i1'), ('completed', 'u1'),
+                                ('padding', 'V1')])
+
+
+class TaskFile:
+    '''A TaskFile is a memory-mapped binary task file. Opening one only maps the file, so it is near-instant whatever
+    the number of tasks, and pages are read from disk only when the records they hold are accessed.
+
+    Records can be read one at a time as Task objects or rows, or as a whole through zero-copy views: records is a
+    memoryview over the raw record bytes, and asNumpy() returns a NumPy structured array view when NumPy is
+    installed. New tasks are appended to the end of the record and string files.
+    '''
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.heap_path = self.path + '.strings'
+        self._records = None
+        self._heap = None
+        self._map()
+
+    @classmethod
+    def create(cls, path, tasks=()):
+        '''Creates (or truncates) a task file holding the given tasks and opens it'''
+        path = os.fspath(path)
+        with open(path, 'wb') as stream:
+            stream.write(HEADER.pack(MAGIC, RECORD.size, 0))
+        open(path + '.strings', 'wb').close()
+        task_file = cls(path)
+        task_file.extend(tasks)
+        return task_file
+
+    def close(self):
+        for mapping in (self._records, self._heap):
+            if mapping is not None:
+                try:
+                    mapping.close()
+                except BufferError:
+                    pass    #views are still exported; the mapping is released when they are
+        self._records = self._heap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _map(self):
+        self.close()
+        with open(self.path, 'rb') as stream:
+            self._records = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, _ = HEADER.unpack_from(self._records)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError('{} is not a task file'.format(self.path))
+        self._count = (len(self._records) - HEADER.size) // RECORD.size
+        if os.path.getsize(self.heap_path):
+            with open(self.heap_path, 'rb') as stream:
+                self._heap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def records(self):
+        '''Zero-copy memoryview over the raw record bytes, RECORD.size bytes per task'''
+        return memoryview(self._records)[HEADER.size:HEADER.size + self._count * RECORD.size]
+
+    def asNumpy(self):
+        '''Zero-copy NumPy structured array over the records, with the fields listed in RECORD_FIELDS'''
+        if numpy is None:
+            raise ImportError('TaskFile.asNumpy requires numpy')
+        return numpy.frombuffer(self._records, dtype=RECORD_DTYPE, count=self._count, offset=HEADER.size)
+
+    def getRow(self, index):
+        '''Returns the task at index as a tuple in the Task.toRow layout'''
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        (predicted_seconds, actual_seconds, name_offset, description_offset, name_length, description_length,
+         task_date, difficulty_level, priority_level, completed) = \
+            RECORD.unpack_from(self._records, HEADER.size + index * RECORD.size)
+        return (self._string(name_offset, name_length),
+                None if description_length < 0 else self._string(description_offset, description_length),
+                None if difficulty_level == NULL_LEVEL else difficulty_level,
+                None if priority_level == NULL_LEVEL else priority_level,
+                None if task_date == NULL_DATE else date.fromordinal(task_date),
+                predicted_seconds,
+                actual_seconds,
+                bool(completed))
+
+    def _string(self, offset, length):
+        if not length:
+            return ''
+        return self._heap[offset:offset + length].decode('utf-8')
+
+    def __getitem__(self, index):
+        return Task.from_row(*self.getRow(index))
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def append(self, task):
+        self.extend((task,))
+
+    def extend(self, tasks):
+        '''Appends tasks to the end of the file; the file is remapped once they are written
+
+        :raises ValueError: if a difficulty or priority level is outside TaskTable.MIN_LEVEL..TaskTable.MAX_LEVEL;
+                            the tasks before it are kept
+        '''
+        heap_offset = os.path.getsize(self.heap_path)
+        try:
+            with open(self.path, 'ab') as records, open(self.heap_path, 'ab') as heap:
+                for task in tasks:
+                    name, description, difficulty_level, priority_level, task_date, predicted_seconds, \
+                        actual_seconds, completed = task.toRow()
+                    name = name.encode('utf-8')
+                    name_offset = heap_offset
+                    if description is None:
+                        description_offset, description_length = name_offset + len(name), -1
+                    else:
+                        description = description.encode('utf-8')
+                        description_offset, description_length = name_offset + len(name), len(description)
+                    #Pack the record first, so that a task that does not fit writes nothing at all
+                    record = RECORD.pack(predicted_seconds, actual_seconds, name_offset, description_offset,
+                                         len(name), description_length,
+                                         NULL_DATE if task_date is None else task_date.toordinal(),
+                                         TaskTable.storedLevel(difficulty_level),
+                                         TaskTable.storedLevel(priority_level),
+                                         1 if completed else 0)
+                    heap.write(name)
+                    heap_offset += len(name)
+                    if description is not None:
+                        heap.write(description)
+                        heap_offset += len(description)
+                    records.write(record)
+        finally:
+            self._map()
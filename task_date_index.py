@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right, insort
+
+from task import Task
+
+
+class _DayBuckets:
+    '''Tasks grouped by task_date ordinal, with the ordinals of the non-empty days kept in a sorted list'''
+
+    def __init__(self):
+        self.days = []              #sorted ordinals of the days that have tasks
+        self.buckets = {}           #ordinal -> {id(task): task}, in insertion order
+
+    def add(self, ordinal, task):
+        bucket = self.buckets.get(ordinal)
+        if bucket is None:
+            bucket = self.buckets[ordinal] = {}
+            insort(self.days, ordinal)
+        bucket[id(task)] = task
+
+    def discard(self, ordinal, task):
+        bucket = self.buckets.get(ordinal)
+        if bucket is None or bucket.pop(id(task), None) is None:
+            return
+        if not bucket:
+            del self.buckets[ordinal]
+            del self.days[bisect_left(self.days, ordinal)]
+
+    def between(self, first, last = None):
+        '''Yields the tasks of the days from ordinal first up to ordinal last (inclusive; None for no end), in date
+        order
+        '''
+        days = self.days
+        start = bisect_left(days, first) if first is not None else 0
+        stop = len(days) if last is None else bisect_right(days, last)
+        for position in range(start, stop):
+            yield from self.buckets[days[position]].values()
+
+
+class TaskDateIndex:
+    '''A TaskDateIndex answers "which tasks are due in this window" queries in O(log n + k). Tasks are grouped into
+    per-day buckets, and the days that have at least one task are kept in a sorted list of date ordinals that is
+    searched with bisect. Incomplete tasks are also kept in buckets of their own, so queries that leave out
+    completed tasks never visit them. The index observes its tasks, so setTaskDate moves a task to its new bucket and
+    toggleCompletion moves it in or out of the incomplete buckets.
+
+    Tasks without a task_date are held by the index but never returned by the date queries.
+    '''
+
+    def __init__(self, tasks=()):
+        self._all = _DayBuckets()
+        self._incomplete = _DayBuckets()
+        self._ordinals = {}         #id(task) -> ordinal, or None for tasks without a date
+        self._undated = {}
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __contains__(self, task):
+        return id(task) in self._ordinals
+
+    def add(self, task):
+        if not isinstance(task, Task):
+            raise TypeError
+        if id(task) in self._ordinals:
+            raise ValueError
+        self._insert(task)
+        task.addObserver(self._onTaskChanged)
+
+    def remove(self, task):
+        if id(task) not in self._ordinals:
+            raise KeyError(task.name)
+        self._delete(task)
+        task.removeObserver(self._onTaskChanged)
+
+    def dueBetween(self, start, end, include_completed=True):
+        '''Yields the tasks whose task_date falls within [start, end], in date order
+
+        :param start: first date of the window
+        :param end: last date of the window, inclusive
+        :param include_completed: also yield tasks that have been completed
+        '''
+        buckets = self._all if include_completed else self._incomplete
+        return buckets.between(start.toordinal(), end.toordinal())
+
+    def overdue(self, today):
+        '''Yields the incomplete tasks whose task_date is before today, oldest first'''
+        return self._incomplete.between(None, today.toordinal() - 1)
+
+    def nextDue(self, n, today, include_completed=False):
+        '''Returns the first n tasks due on or after today, in date order'''
+        buckets = self._all if include_completed else self._incomplete
+        found = []
+        if n > 0:
+            for task in buckets.between(today.toordinal()):
+                found.append(task)
+                if len(found) == n:
+                    break
+        return found
+
+    def _insert(self, task):
+        if task.task_date is None:
+            self._ordinals[id(task)] = None
+            self._undated[id(task)] = task
+            return
+        ordinal = task.task_date.toordinal()
+        self._ordinals[id(task)] = ordinal
+        self._all.add(ordinal, task)
+        if not task.completed:
+            self._incomplete.add(ordinal, task)
+
+    def _delete(self, task):
+        ordinal = self._ordinals.pop(id(task))
+        if ordinal is None:
+            del self._undated[id(task)]
+            return
+        self._all.discard(ordinal, task)
+        self._incomplete.discard(ordinal, task)
+
+    def _onTaskChanged(self, task, attribute):
+        if attribute == 'task_date':
+            self._delete(task)
+            self._insert(task)
+        elif attribute == 'completed':
+            ordinal = self._ordinals[id(task)]
+            if ordinal is None:
+                return
+            if task.completed:
+                self._incomplete.discard(ordinal, task)
+            else:
+                self._incomplete.add(ordinal, task)
@@ -0,0 +1,204 @@
+import csv
+import gzip
+import json
+import os
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+
+from task import Task
+
+
+#Record fields, in Task.toRow order; times required are written as integer seconds and task_date as YYYY-MM-DD
+FIELDS = Task.SQL_COLUMNS
+
+FORMATS = ('jsonl', 'csv')
+
+
+def dump_tasks(tasks, fp, format = None, compression = None, chunk_size = 1000):
+    '''Writes tasks one record at a time as JSON Lines or CSV, holding at most chunk_size records in memory.
+
+    JSON Lines round-trips every task exactly. CSV is lossy for empty strings: None and '' are both written as an
+    empty field, so an empty description is read back as None.
+
+    :param tasks: an iterable of Task objects
+    :param fp: a path, or a file object (text mode, or binary mode when compression is 'gzip')
+    :param format: 'jsonl' or 'csv'; by default taken from the file name as in load_tasks, falling back to 'jsonl'
+    :param compression: None or 'gzip'; paths ending in .gz are always gzip-compressed
+    :param chunk_size: number of records rendered per write to the file
+    :return: the number of records written
+    '''
+    format = format or _formatOf(fp)
+    if format not in FORMATS:
+        raise ValueError
+    rows = (task.toRow() for task in tasks)
+    with _open(fp, 'w', compression) as stream:
+        if format == 'jsonl':
+            return _dumpJSONLines(rows, stream, chunk_size)
+        return _dumpCSV(rows, stream, chunk_size)
+
+
+def load_tasks(fp, format = None, compression = None):
+    '''Yields the tasks stored in a JSON Lines or CSV file written by dump_tasks, one record at a time
+
+    :param fp: a path, or a file object (text mode, or binary mode when compression is 'gzip')
+    :param format: 'jsonl' or 'csv'; by default taken from the file name, falling back to 'jsonl'
+    :param compression: None or 'gzip'; paths ending in .gz are always read as gzip
+    '''
+    for chunk in load_row_chunks(fp, format, compression):
+        for row in chunk:
+            yield Task.from_row(*row)
+
+
+def load_row_chunks(fp, format = None, compression = None, chunk_size = 10000):
+    '''Chunked fast path of load_tasks: yields lists of up to chunk_size rows in the Task.toRow layout without building
+    Task objects, ready for TaskTable.extendRows or Task.from_row
+    '''
+    format = format or _formatOf(fp)
+    if format not in FORMATS:
+        raise ValueError
+    with _open(fp, 'r', compression) as stream:
+        rows = _loadJSONLines(stream) if format == 'jsonl' else _loadCSV(stream)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def render_tasks(tasks, fp, kind = 'str', table_name = None, separator = '\n', compression = None):
+    '''Writes the __str__ rendering or getSQLInsertStatement of many tasks into one file or buffer, through
+    Task.writeStr and Task.writeSQLInsert: renderings already cached on a task are written as they are, and others
+    are written piece by piece without joining them into an intermediate string for the task.
+
+    :param tasks: an iterable of Task objects
+    :param fp: a path, or a file object (text mode, or binary mode when compression is 'gzip')
+    :param kind: 'str' for the __str__ rendering, 'sql' for getSQLInsertStatement
+    :param table_name: table name used by the 'sql' rendering
+    :param separator: written after every task
+    :return: the number of tasks written
+    '''
+    if kind == 'sql':
+        if table_name is None:
+            raise ValueError
+    elif kind != 'str':
+        raise ValueError
+    count = 0
+    with _open(fp, 'w', compression) as stream:
+        write = stream.write
+        for task in tasks:
+            if kind == 'str':
+                task.writeStr(stream)
+            else:
+                task.writeSQLInsert(stream, table_name)
+            write(separator)
+            count += 1
+    return count
+
+
+#zlib's default level; gzip.open's default of 9 is several times slower for little gain on task records
+GZIP_LEVEL = 6
+
+
+@contextmanager
+def _open(fp, mode, compression):
+    if isinstance(fp, (str, os.PathLike)):
+        if compression == 'gzip' or os.fspath(fp).endswith('.gz'):
+            stream = gzip.open(fp, mode + 't', GZIP_LEVEL, encoding='utf-8', newline='')
+        else:
+            stream = open(fp, mode, encoding='utf-8', newline='')
+        with stream:
+            yield stream
+    elif compression == 'gzip':
+        with gzip.open(fp, mode + 't', GZIP_LEVEL, encoding='utf-8', newline='') as stream:
+            yield stream
+    elif compression is None:
+        yield fp
+    else:
+        raise ValueError
+
+
+def _formatOf(fp):
+    if isinstance(fp, (str, os.PathLike)):
+        path = os.fspath(fp)
+        if path.endswith('.gz'):
+            path = path[:-3]
+        if path.endswith('.csv'):
+            return 'csv'
+    return 'jsonl'
+
+
+def _dumpJSONLines(rows, stream, chunk_size):
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return count
+        lines = []
+        for name, description, difficulty_level, priority_level, task_date, predicted, actual, completed in chunk:
+            lines.append(encode({'name': name,
+                                 'description': description,
+                                 'difficulty_level': difficulty_level,
+                                 'priority_level': priority_level,
+                                 'task_date': None if task_date is None else task_date.isoformat(),
+                                 'predicted_time_required': predicted,
+                                 'actual_time_required': actual,
+                                 'completed': bool(completed)}))
+        lines.append('')
+        stream.write('\n'.join(lines))
+        count += len(chunk)
+
+
+def _loadJSONLines(stream):
+    decode = json.JSONDecoder().decode
+    fromisoformat = date.fromisoformat
+    for line in stream:
+        if not line.strip():
+            continue
+        record = decode(line)
+        task_date = record.get('task_date')
+        yield (record['name'],
+               record.get('description'),
+               record.get('difficulty_level'),
+               record.get('priority_level'),
+               None if task_date is None else fromisoformat(task_date),
+               int(record.get('predicted_time_required', 0)),
+               int(record.get('actual_time_required', 0)),
+               bool(record.get('completed', False)))
+
+
+def _dumpCSV(rows, stream, chunk_size):
+    writer = csv.writer(stream, lineterminator='\n')
+    writer.writerow(FIELDS)
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return count
+        writer.writerows([(name, description, difficulty_level, priority_level,
+                           None if task_date is None else task_date.isoformat(),
+                           predicted, actual, 1 if completed else 0)
+                          for name, description, difficulty_level, priority_level, task_date, predicted, actual,
+                              completed in chunk])
+        count += len(chunk)
+
+
+def _loadCSV(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    if tuple(header) != FIELDS:
+        raise ValueError('unexpected CSV header {}'.format(header))
+    fromisoformat = date.fromisoformat
+    #csv writes None and empty strings alike as an empty field, so empty optional fields are read back as None
+    for name, description, difficulty_level, priority_level, task_date, predicted, actual, completed in reader:
+        yield (name,
+               description or None,
+               int(difficulty_level) if difficulty_level else None,
+               int(priority_level) if priority_level else None,
+               fromisoformat(task_date) if task_date else None,
+               int(predicted),
+               int(actual),
+               completed == '1')
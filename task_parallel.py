@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, islice
+
+from task_table import TaskTable
+
+
+def parallel_map_reduce(tasks, mapper, reducer, workers = None, chunk_size = 50000):
+    '''Runs mapper over chunks of a task collection in worker processes and merges the partial results with reducer.
+
+    Chunks are shipped to the workers as TaskTable objects, whose typed columns pickle as a few flat buffers instead
+    of one pickled Task per row. At most two chunks per worker are in flight, so the input is streamed rather than
+    partitioned up front. Partial results are reduced in chunk order.
+
+    :param tasks: an iterable of Task objects, or a TaskTable
+    :param mapper: a module-level function (so that it can be pickled) mapping a TaskTable chunk to a partial result,
+                   e.g. totals_by_day; use functools.partial to bind extra arguments
+    :param reducer: a function merging two partial results, e.g. merge_totals
+    :param workers: number of worker processes, by default os.cpu_count()
+    :param chunk_size: number of tasks per chunk
+    :return: the reduced result, or None when there are no tasks
+    '''
+    if chunk_size < 1:
+        raise ValueError
+    workers = workers or os.cpu_count() or 1
+    result = None
+    have_result = False
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for chunk in _chunks(tasks, chunk_size):
+            pending.append(executor.submit(mapper, chunk))
+            if len(pending) >= 2 * workers:
+                partial = pending.pop(0).result()
+                result = reducer(result, partial) if have_result else partial
+                have_result = True
+        for future in pending:
+            partial = future.result()
+            result = reducer(result, partial) if have_result else partial
+            have_result = True
+    return result
+
+
+def _chunks(tasks, chunk_size):
+    if isinstance(tasks, TaskTable):
+        for start in range(0, len(tasks), chunk_size):
+            yield tasks[start:start + chunk_size]
+        return
+    iterator = iter(tasks)
+    while True:
+        chunk = TaskTable(islice(iterator, chunk_size))
+        if not len(chunk):
+            return
+        yield chunk
+
+
+#Mappers and reducers for the nightly reports
+
+def totals_by_day(table):
+    '''Maps a chunk to {task_date ordinal: [count, predicted seconds, actual seconds]}; undated tasks use ordinal 0'''
+    totals = {}
+    for ordinal, predicted, actual in zip(table.task_dates, table.predicted_seconds, table.actual_seconds):
+        total = totals.get(ordinal)
+        if total is None:
+            totals[ordinal] = [1, predicted, actual]
+        else:
+            total[0] += 1
+            total[1] += predicted
+            total[2] += actual
+    return totals
+
+
+def merge_totals(left, right):
+    '''Reducer for totals_by_day'''
+    for key, (count, predicted, actual) in right.items():
+        total = left.get(key)
+        if total is None:
+            left[key] = [count, predicted, actual]
+        else:
+            total[0] += count
+            total[1] += predicted
+            total[2] += actual
+    return left
+
+
+def estimate_error(table):
+    '''Maps a chunk to (count, sum of errors, sum of absolute errors, sum of squared errors) of actual minus predicted
+    seconds over its completed tasks
+    '''
+    errors = [actual - predicted
+              for actual, predicted in compress(zip(table.actual_seconds, table.predicted_seconds), table.completed)]
+    return (len(errors), sum(errors), sum(map(abs, errors)), sum(error * error for error in errors))
+
+
+def overdue_count(table, today):
+    '''Maps a chunk to the number of incomplete tasks dated before today; bind today with functools.partial'''
+    limit = today.toordinal()
+    null = TaskTable.NULL_DATE
+    return sum(1 for ordinal, completed in zip(table.task_dates, table.completed)
+               if not completed and ordinal != null and ordinal < limit)
+
+
+def add_tuples(left, right):
+    '''Reducer adding numbers or tuples of numbers element-wise, e.g. for estimate_error and overdue_count'''
+    if isinstance(left, tuple):
+        return tuple(a + b for a, b in zip(left, right))
+    return left + right
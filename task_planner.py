@@ -0,0 +1,274 @@
+from datetime import timedelta
+
+from task import Task
+
+
+class CapacityPlanner:
+    '''A CapacityPlanner assigns incomplete tasks to days, starting at start_date, so that the predicted time required
+    by the tasks of a day never exceeds daily_budget.
+
+    plan() places tasks by priority_level (highest first), then task_date, then predicted_time_required. Each task goes
+    on the earliest day that still has room for it; a task whose earliest such day falls after its task_date (its due
+    date) is still placed there and is listed in late. Tasks without a task_date have no due date. Tasks that need
+    more than daily_budget on their own are listed in unscheduled. The remaining capacity of the days is kept in a max
+    segment tree, so each placement takes O(log days) and planning n tasks takes O(n log n).
+
+    The planner observes the tasks it holds: when setPredictedTimeRequired, setTaskDate, setPriorityLevel or
+    toggleCompletion change a task, only that task is moved (or dropped once completed). Capacity freed on a day is
+    given to the late tasks that it lets finish by their due date, earliest due date first; a second segment tree of
+    the smallest late task per due date finds them in O(log days). Calling plan() again gives the full priority
+    ordering.
+    '''
+
+    _REPLANNING_ATTRIBUTES = ('predicted_time_required', 'task_date', 'priority_level', 'completed')
+
+    ORDERING = ('-priority_level', 'task_date', 'predicted_time_required')
+
+    def __init__(self, daily_budget, start_date, horizon_days = 365):
+        if not isinstance(daily_budget, timedelta):
+            raise TypeError
+        if horizon_days < 1:
+            raise ValueError
+        self.daily_budget = daily_budget
+        self.start_date = start_date
+        self._budget = daily_budget.days * 86400 + daily_budget.seconds
+        self._start = start_date.toordinal()
+        self._placements = {}       #id(task) -> (task, day index, seconds)
+        self._days = {}             #day index -> {id(task): task}
+        self._late = {}             #id(task) -> due day index, for tasks placed after their due date
+        self._lateByDue = {}        #due day index -> {id(task): seconds}, for late tasks due on or after start_date
+        self._unscheduled = {}
+        self._buildTree(horizon_days)
+
+    #Planning
+
+    def plan(self, tasks):
+        '''Discards the current plan and places the incomplete tasks among tasks
+
+        :return: the planner
+        '''
+        for task in self.tasks():
+            task.removeObserver(self._onTaskChanged)
+        self._placements.clear()
+        self._days.clear()
+        self._late.clear()
+        self._lateByDue.clear()
+        self._unscheduled.clear()
+        self._buildTree(self._size)
+        key = Task.sort_key(self.ORDERING)
+        for task in sorted((task for task in tasks if not task.completed), key=key):
+            self._place(task)
+            task.addObserver(self._onTaskChanged)
+        return self
+
+    def add(self, task):
+        '''Places one more task without re-planning the others'''
+        if not isinstance(task, Task):
+            raise TypeError
+        if task in self:
+            raise ValueError
+        if not task.completed:
+            self._place(task)
+            task.addObserver(self._onTaskChanged)
+
+    def remove(self, task):
+        '''Removes a task from the plan, freeing its capacity for late tasks'''
+        if task not in self:
+            raise KeyError(task.name)
+        placement = self._placements.get(id(task))
+        self._unplace(task)
+        task.removeObserver(self._onTaskChanged)
+        if placement is not None:
+            self._retryLate(placement[1])
+
+    #Reading the plan
+
+    def __contains__(self, task):
+        return id(task) in self._placements or id(task) in self._unscheduled
+
+    def tasks(self):
+        return [placement[0] for placement in self._placements.values()] + list(self._unscheduled.values())
+
+    def dayOf(self, task):
+        '''Returns the date a task is planned for, or None if it is not placed'''
+        placement = self._placements.get(id(task))
+        if placement is None:
+            return None
+        return self.start_date + timedelta(days=placement[1])
+
+    def tasksOn(self, day):
+        return list(self._days.get(day.toordinal() - self._start, {}).values())
+
+    def remainingOn(self, day):
+        index = day.toordinal() - self._start
+        if not 0 <= index < self._size:
+            return self.daily_budget if index >= 0 else timedelta(0)
+        return timedelta(seconds=self._tree[self._leaves + index])
+
+    def schedule(self):
+        '''Returns the plan as {date: [tasks]}, in date order'''
+        return {self.start_date + timedelta(days=index): list(self._days[index].values())
+                for index in sorted(self._days)}
+
+    @property
+    def late(self):
+        '''Tasks that could only be placed after their task_date'''
+        return [self._placements[key][0] for key in self._late]
+
+    @property
+    def unscheduled(self):
+        '''Tasks whose predicted time required exceeds the daily budget'''
+        return list(self._unscheduled.values())
+
+    #Placement
+
+    def _place(self, task):
+        task_date, seconds = task.toRow()[4:6]
+        if seconds > self._budget:
+            self._unscheduled[id(task)] = task
+            return
+        index = self._findFirst(seconds)
+        while index < 0:
+            self._buildTree(2 * self._size)
+            index = self._findFirst(seconds)
+        self._placements[id(task)] = (task, index, seconds)
+        self._days.setdefault(index, {})[id(task)] = task
+        self._update(index, -seconds)
+        if task_date is not None:
+            due = task_date.toordinal() - self._start
+            if index > due:
+                self._late[id(task)] = due
+                if due >= 0:
+                    self._lateByDue.setdefault(due, {})[id(task)] = seconds
+                    if seconds < self._lateTree[self._leaves + due]:
+                        self._updateLate(due, seconds)
+
+    def _unplace(self, task):
+        if self._unscheduled.pop(id(task), None) is not None:
+            return
+        task, index, seconds = self._placements.pop(id(task))
+        day = self._days[index]
+        del day[id(task)]
+        if not day:
+            del self._days[index]
+        self._update(index, seconds)
+        due = self._late.pop(id(task), -1)
+        if due >= 0:
+            bucket = self._lateByDue[due]
+            del bucket[id(task)]
+            if not bucket:
+                del self._lateByDue[due]
+                self._updateLate(due, _NO_LATE_TASK)
+            elif seconds == self._lateTree[self._leaves + due]:
+                self._updateLate(due, min(bucket.values()))
+
+    def _retryLate(self, freed):
+        '''Moves into the capacity freed on day index freed the late tasks due on or after that day, earliest due date
+        first; each move frees capacity on the day the task came from, which is handed out in turn
+        '''
+        freed = [freed]
+        while freed and self._lateByDue:
+            index = freed.pop()
+            while True:
+                remaining = self._tree[self._leaves + index]
+                due = self._findLate(index, remaining)
+                if due < 0:
+                    break
+                bucket = self._lateByDue[due]
+                key = min(bucket, key=bucket.get)
+                task, previous, _ = self._placements[key]
+                self._unplace(task)
+                self._place(task)
+                freed.append(previous)
+
+    def _onTaskChanged(self, task, attribute):
+        if attribute in self._REPLANNING_ATTRIBUTES:
+            placement = self._placements.get(id(task))
+            self._unplace(task)
+            if task.completed:
+                task.removeObserver(self._onTaskChanged)
+            else:
+                self._place(task)
+            if placement is not None:
+                self._retryLate(placement[1])
+
+    #Segment trees over the days: _tree holds the maximum remaining seconds, _lateTree the minimum seconds of the
+    #late tasks due on each day
+
+    def _buildTree(self, size):
+        '''(Re)builds the trees for size days, keeping the remaining capacity of the days already in use'''
+        leaves = 1
+        while leaves < size:
+            leaves *= 2
+        tree = [0] * (2 * leaves)
+        for index in range(size):
+            tree[leaves + index] = self._budget
+        for index, day in self._days.items():
+            tree[leaves + index] = self._budget - sum(self._placements[key][2] for key in day)
+        lateTree = [_NO_LATE_TASK] * (2 * leaves)
+        for due, bucket in self._lateByDue.items():
+            lateTree[leaves + due] = min(bucket.values())
+        for node in range(leaves - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            lateTree[node] = min(lateTree[2 * node], lateTree[2 * node + 1])
+        self._tree = tree
+        self._lateTree = lateTree
+        self._leaves = leaves
+        self._size = size
+
+    def _update(self, index, delta):
+        tree = self._tree
+        node = self._leaves + index
+        tree[node] += delta
+        node //= 2
+        while node:
+            value = max(tree[2 * node], tree[2 * node + 1])
+            if tree[node] == value:
+                break   #the maxima above are unchanged too
+            tree[node] = value
+            node //= 2
+
+    def _updateLate(self, due, seconds):
+        tree = self._lateTree
+        node = self._leaves + due
+        tree[node] = seconds
+        node //= 2
+        while node:
+            tree[node] = min(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def _findFirst(self, seconds):
+        '''Returns the first day index with at least seconds of remaining capacity, or -1'''
+        tree = self._tree
+        if tree[1] < seconds:
+            return -1
+        node = 1
+        while node < self._leaves:
+            node *= 2
+            if tree[node] < seconds:
+                node += 1
+        index = node - self._leaves
+        return index if index < self._size else -1
+
+    def _findLate(self, first, seconds):
+        '''Returns the first due day index from first on with a late task needing at most seconds, or -1'''
+        tree = self._lateTree
+        leaves = self._leaves
+        #Walk the nodes covering [first, leaves) from left to right, then descend into the first one that qualifies
+        node = leaves + first
+        while True:
+            if tree[node] <= seconds:
+                break
+            while node & 1:
+                node //= 2
+                if node == 0:
+                    return -1
+            node += 1
+        while node < leaves:
+            node *= 2
+            if tree[node] > seconds:
+                node += 1
+        return node - leaves
+
+
+_NO_LATE_TASK = float('inf')
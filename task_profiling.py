@@ -0,0 +1,169 @@
+'''Opt-in instrumentation of the Task hot paths. While enabled, the instrumented Task methods are replaced by wrappers
+that count calls and accumulate wall time per operation; comparisons and __add__ are also broken down by the active
+sortingKey. Disabling restores the original methods, so there is no overhead at all when instrumentation is off.
+
+    with task_profiling.profile() as result:
+        tasks.sort()
+    print(result.counters)
+'''
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from task import Task
+
+
+#Instrumented Task methods; those in _KEYED_OPERATIONS are recorded per sortingKey field
+OPERATIONS = ('__init__', 'from_row',
+              '__lt__', '__gt__', '__le__', '__ge__', '__eq__', '__ne__', '__add__',
+              'setPriorityLevel', 'setDifficultyLevel', 'setDescription', 'setTaskDate',
+              'setPredictedTimeRequired', 'setActualTimeRequired', 'toggleCompletion',
+              'getSQLInsertStatement', 'getSQLCreateStatement', 'getSQLValues', '__str__')
+_KEYED_OPERATIONS = ('__lt__', '__gt__', '__le__', '__ge__', '__eq__', '__ne__', '__add__')
+
+_lock = threading.Lock()
+_counters = {}      #(operation, sorting key field or None) -> [calls, seconds]
+_originals = {}     #operation -> the attribute found in Task.__dict__ before instrumenting
+_enabled = 0        #number of enable() calls not yet matched by disable()
+
+
+def enable():
+    '''Installs the instrumentation wrappers on Task; calls nest, and each must be matched by a disable()'''
+    global _enabled
+    with _lock:
+        _enabled += 1
+        if _enabled > 1:
+            return
+        for operation in OPERATIONS:
+            original = Task.__dict__[operation]
+            _originals[operation] = original
+            setattr(Task, operation, _instrument(operation, original))
+
+
+def disable():
+    '''Restores the original Task methods once every enable() has been matched'''
+    global _enabled
+    with _lock:
+        if not _enabled:
+            return
+        _enabled -= 1
+        if _enabled:
+            return
+        for operation, original in _originals.items():
+            setattr(Task, operation, original)
+        _originals.clear()
+
+
+def is_enabled():
+    return _enabled > 0
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def counters():
+    '''Returns the counters as {name: {'calls': n, 'seconds': s}}; names of keyed operations carry the sortingKey field,
+    e.g. "__lt__[task_date]"
+    '''
+    with _lock:
+        items = [(key, list(value)) for key, value in _counters.items()]
+    return {_name(operation, sorting_key): {'calls': calls, 'seconds': seconds}
+            for (operation, sorting_key), (calls, seconds) in sorted(items, key=lambda item: _name(*item[0]))}
+
+
+def prometheus_text(prefix = 'task'):
+    '''Returns the counters in the Prometheus text exposition format'''
+    with _lock:
+        items = sorted(((key, list(value)) for key, value in _counters.items()), key=lambda item: _name(*item[0]))
+    lines = ['# HELP {}_operation_calls_total Number of calls of instrumented Task operations.'.format(prefix),
+             '# TYPE {}_operation_calls_total counter'.format(prefix)]
+    lines += ['{}_operation_calls_total{{{}}} {}'.format(prefix, _labels(*key), calls)
+              for key, (calls, seconds) in items]
+    lines += ['# HELP {}_operation_seconds_total Wall time spent in instrumented Task operations.'.format(prefix),
+              '# TYPE {}_operation_seconds_total counter'.format(prefix)]
+    lines += ['{}_operation_seconds_total{{{}}} {!r}'.format(prefix, _labels(*key), seconds)
+              for key, (calls, seconds) in items]
+    return '\n'.join(lines) + '\n'
+
+
+class Profile:
+    '''Result of a profile() block; counters holds the calls and seconds recorded inside the block'''
+
+    def __init__(self):
+        self.counters = {}
+        self.seconds = 0.0
+
+
+@contextmanager
+def profile():
+    '''Enables instrumentation for the duration of the with block and yields a Profile that is filled with the
+    counters recorded inside the block when it exits. Counters recorded by other threads during the block are included.
+    '''
+    result = Profile()
+    before = counters()
+    enable()
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.seconds = time.perf_counter() - started
+        disable()
+        after = counters()
+        for name, value in after.items():
+            previous = before.get(name, {'calls': 0, 'seconds': 0.0})
+            calls = value['calls'] - previous['calls']
+            if calls:
+                result.counters[name] = {'calls': calls, 'seconds': value['seconds'] - previous['seconds']}
+
+
+def _name(operation, sorting_key):
+    return operation if sorting_key is None else '{}[{}]'.format(operation, sorting_key)
+
+
+def _labels(operation, sorting_key):
+    if sorting_key is None:
+        return 'operation="{}"'.format(operation)
+    return 'operation="{}",sorting_key="{}"'.format(operation, sorting_key)
+
+
+def _record(key, seconds):
+    with _lock:
+        counter = _counters.get(key)
+        if counter is None:
+            _counters[key] = [1, seconds]
+        else:
+            counter[0] += 1
+            counter[1] += seconds
+
+
+def _instrument(operation, original):
+    if isinstance(original, classmethod):
+        return classmethod(_instrument(operation, original.__func__))
+
+    perf_counter = time.perf_counter
+    if operation in _KEYED_OPERATIONS:
+        fields = Task.SORT_FIELDS
+        currentSortingKey = Task.currentSortingKey
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            key = (operation, fields[currentSortingKey()])
+            started = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                _record(key, perf_counter() - started)
+    else:
+        key = (operation, None)
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                _record(key, perf_counter() - started)
+    return wrapper
@@ -0,0 +1,237 @@
+import itertools
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+from task import Task
+from task_sql import bulk_insert
+
+
+#Indexes matching the ORDER BY of top_priority, with and without the completed filter, so that it reads the rows in
+#order instead of sorting them
+_ORDER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS {0}_open_priority_idx ON {0} (completed, priority_level DESC, task_date IS NULL, "
+    "task_date)",
+    "CREATE INDEX IF NOT EXISTS {0}_priority_date_idx ON {0} (priority_level DESC, task_date IS NULL, task_date)",
+)
+
+
+class TaskRepository:
+    '''A TaskRepository stores tasks in a SQLite table created from Task.getSQLCreateStatement, with secondary indexes
+    on task_date, priority_level and completed. Connections are kept in a pool and reused across calls and threads.
+    Query methods filter in SQL and return generators that build Task objects one row at a time, so results are never
+    loaded into memory as a whole.
+
+    Results are read fetch_size rows per statement, each chunk continuing after the last row of the previous one
+    (keyset pagination). No statement stays open and no connection is held between chunks, so the repository can be
+    written to while a query is being iterated; rows added or changed meanwhile may or may not be seen by it.
+    '''
+
+    _memoryDatabases = itertools.count()
+
+    def __init__(self, path = ':memory:', table_name = 'tasks', pool_size = 4, fetch_size = 1000):
+        '''
+        :param path: path of the SQLite database file; ':memory:' creates a private in-memory database shared by
+                     the pooled connections
+        :param table_name: name of the task table, created with its indexes if it does not exist yet
+        :param pool_size: number of connections kept open
+        :param fetch_size: number of rows read per statement while streaming results
+        '''
+        if pool_size < 1 or fetch_size < 1:
+            raise ValueError
+        if path == ':memory:':
+            #The memdb VFS shares one in-memory database between the pooled connections with normal file locking,
+            #unlike a shared-cache database, whose table locks fail at once instead of waiting for the busy timeout
+            path = "file:/task_repository_{}?vfs=memdb".format(next(self._memoryDatabases))
+            uri = True
+        else:
+            uri = False
+        self.table_name = table_name
+        self.fetch_size = fetch_size
+        self._pool = queue.LifoQueue()
+        self._connections = [sqlite3.connect(path, uri=uri, check_same_thread=False) for _ in range(pool_size)]
+        if not uri:
+            #Lets pooled readers run while another connection writes
+            self._connections[0].execute("PRAGMA journal_mode=WAL")
+        for connection in self._connections:
+            self._pool.put(connection)
+        self.createTable()
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def connection(self):
+        '''Borrows a connection from the pool for the duration of the with block'''
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def createTable(self):
+        with self.connection() as connection:
+            exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                        (self.table_name,)).fetchone()
+            if not exists:
+                connection.execute(Task.getSQLCreateStatement(self.table_name, dialect='sqlite'))
+                for statement in Task.getSQLIndexStatements(self.table_name):
+                    connection.execute(statement)
+            #Also added to tables created before these indexes existed
+            for statement in _ORDER_INDEXES:
+                connection.execute(statement.format(self.table_name))
+            connection.commit()
+
+    #Writes
+
+    def add(self, task):
+        '''Inserts a task and returns its row id'''
+        statement = "INSERT INTO {} ({}) VALUES ({})".format(self.table_name, ",".join(Task.SQL_COLUMNS),
+                                                             ",".join("?" * len(Task.SQL_COLUMNS)))
+        with self.connection() as connection:
+            row_id = connection.execute(statement, task.getSQLValues('sqlite')).lastrowid
+            connection.commit()
+        return row_id
+
+    def addMany(self, tasks, batch_size = 1000):
+        '''Inserts an iterable of tasks in batches, see task_sql.bulk_insert; returns the number of rows inserted'''
+        with self.connection() as connection:
+            return bulk_insert(connection, tasks, self.table_name, batch_size=batch_size, dialect='sqlite')
+
+    def put(self, items):
+        '''Inserts or replaces tasks by row id in a single transaction
+
+        :param items: an iterable of (row id, task) pairs
+        '''
+        statement = "INSERT OR REPLACE INTO {} (id,{}) VALUES (?,{})".format(
+            self.table_name, ",".join(Task.SQL_COLUMNS), ",".join("?" * len(Task.SQL_COLUMNS)))
+        with self.connection() as connection:
+            connection.executemany(statement, [(row_id,) + task.getSQLValues('sqlite') for row_id, task in items])
+            connection.commit()
+
+    #Queries
+
+    def count(self):
+        with self.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM {}".format(self.table_name)).fetchone()[0]
+
+    def maxId(self):
+        '''Returns the largest row id in the table, or 0 when it is empty'''
+        with self.connection() as connection:
+            return connection.execute("SELECT MAX(id) FROM {}".format(self.table_name)).fetchone()[0] or 0
+
+    def get(self, row_id):
+        '''Returns the task stored under row_id, or None'''
+        for task in self._select("id = ?", (row_id,)):
+            return task
+        return None
+
+    def items(self):
+        '''Yields (row id, task) pairs for every task, ordered by id'''
+        return self._select("", (), with_ids=True)
+
+    def dueBetween(self, start, end):
+        '''Yields the tasks whose task_date falls within [start, end], ordered by task_date'''
+        return self._select("task_date BETWEEN ? AND ?", (start.isoformat(), end.isoformat()),
+                            order=(("task_date", False),))
+
+    def top_priority(self, n, include_completed = False):
+        '''Yields the n tasks with the highest priority_level, ties broken by task_date; tasks without a priority or
+        date come after those that have one, as in TaskScheduler.ORDERING
+        '''
+        #task_date IS NULL puts undated tasks last; the ordering matches _ORDER_INDEXES so no sort is needed
+        order = (("priority_level", True), ("task_date IS NULL", False), ("task_date", False))
+        return self._select("" if include_completed else "completed = 0", (), order=order, limit=n)
+
+    def incomplete(self):
+        '''Yields every task that has not been completed, ordered by id'''
+        return self._select("completed = 0", ())
+
+    def all(self):
+        return self._select("", ())
+
+    def _select(self, where, parameters, order = (), limit = None, with_ids = False):
+        '''Yields the tasks matching the where condition in the given order, reading them one chunk at a time
+
+        :param where: SQL condition, or an empty string
+        :param parameters: parameters bound to the condition
+        :param order: (expression, descending) pairs; the row id is always appended as the final tie-breaker.
+                      Expressions may be NULL, which SQLite sorts first in ascending and last in descending order
+        :param limit: maximum number of tasks, or None
+        :param with_ids: yield (row id, task) pairs
+        '''
+        order = tuple(order) + (("id", False),)
+        keys = len(order)
+        select = "SELECT {},{} FROM {} WHERE ".format(",".join(expression for expression, _ in order),
+                                                      ",".join(Task.SQL_COLUMNS), self.table_name)
+        ordering = " ORDER BY {} LIMIT ?".format(
+            ",".join(expression + (" DESC" if descending else "") for expression, descending in order))
+        last = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = self.fetch_size if remaining is None else min(self.fetch_size, remaining)
+            conditions = ["({})".format(where)] if where else []
+            arguments = list(parameters)
+            if last is not None:
+                condition, values = _keysetCondition(order, last)
+                conditions.append(condition)
+                arguments.extend(values)
+            statement = select + (" AND ".join(conditions) or "1") + ordering
+            with self.connection() as connection:
+                rows = connection.execute(statement, arguments + [size]).fetchall()
+            for row in rows:
+                if with_ids:
+                    yield row[keys - 1], _taskFromRow(row[keys:])
+                else:
+                    yield _taskFromRow(row[keys:])
+            if len(rows) < size:
+                return
+            last = rows[-1][:keys]
+            if remaining is not None:
+                remaining -= len(rows)
+
+
+def _keysetCondition(order, last):
+    '''Builds the condition selecting the rows that come after the row whose order keys are last, and its parameters.
+    Ties on the leading keys are decided by the next key; NULL keys are matched with IS and IS NOT NULL.
+    '''
+    terms = []
+    values = []
+    order = [("({})".format(expression), descending) for expression, descending in order]
+    for index, (expression, descending) in enumerate(order):
+        value = last[index]
+        if value is None:
+            #NULL sorts first, so an ascending key follows it with any value and a descending key with none
+            if descending:
+                continue
+            after, after_values = "{} IS NOT NULL".format(expression), []
+        elif descending:
+            after, after_values = "({0} < ? OR {0} IS NULL)".format(expression), [value]
+        else:
+            after, after_values = "{} > ?".format(expression), [value]
+        terms.append(" AND ".join(["{} IS ?".format(leading) for leading, _ in order[:index]] + [after]))
+        values.extend(last[:index])
+        values.extend(after_values)
+    if not terms:
+        return "0", values
+    first, descending = order[0]
+    if not descending and last[0] is not None:
+        #Redundant bound on the leading key, so that SQLite seeks to the start of the chunk in its index
+        return "({} >= ? AND ({}))".format(first, " OR ".join(terms)), [last[0]] + values
+    return "({})".format(" OR ".join(terms)), values
+
+
+def _taskFromRow(row):
+    name, description, difficulty_level, priority_level, task_date, predicted_seconds, actual_seconds, completed = row
+    return Task.from_row(name, description, difficulty_level, priority_level,
+                         None if task_date is None else date.fromisoformat(task_date),
+                         predicted_seconds, actual_seconds, bool(completed))
@@ -0,0 +1,128 @@
+import heapq
+import itertools
+
+from task import Task
+
+
+class TaskScheduler:
+    '''A TaskScheduler hands out the most urgent incomplete task in O(log n). Tasks are kept in a binary heap ordered by
+    priority_level (highest first), then task_date (earliest first), then predicted_time_required (shortest first);
+    tasks without a priority or date come after those that have one.
+
+    The scheduler observes every task it holds. When setPriorityLevel, setTaskDate or setPredictedTimeRequired change a
+    task its heap entry is marked as removed and a new entry is pushed; toggleCompletion removes a completed task and
+    re-adds it when it is toggled back. Removed entries are discarded lazily when they reach the top of the heap.
+    '''
+
+    ORDERING = ('-priority_level', 'task_date', 'predicted_time_required')
+
+    _REORDERING_ATTRIBUTES = ('priority_level', 'task_date', 'predicted_time_required', 'completed')
+
+    def __init__(self, tasks=()):
+        self._heap = []
+        self._entries = {}      #id(task) -> live heap entry, for incomplete tasks only
+        self._tasks = {}        #id(task) -> task, for every task observed by the scheduler
+        self._counter = itertools.count()
+        self._key = Task.sort_key(self.ORDERING)
+        self.extend(tasks)
+
+    def __len__(self):
+        '''Number of incomplete tasks waiting in the scheduler'''
+        return len(self._entries)
+
+    def __contains__(self, task):
+        return id(task) in self._entries
+
+    def push(self, task):
+        '''Adds a task to the scheduler, or re-positions it if it is already held. Completed tasks are kept aside
+        until they are toggled back to incomplete.
+        '''
+        if not isinstance(task, Task):
+            raise TypeError
+        if id(task) not in self._tasks:
+            self._tasks[id(task)] = task
+            task.addObserver(self._onTaskChanged)
+        self._invalidate(task)
+        if not task.completed:
+            entry = [self._key(task), next(self._counter), task]
+            self._entries[id(task)] = entry
+            heapq.heappush(self._heap, entry)
+
+    def extend(self, tasks):
+        '''Adds many tasks at once; new tasks are appended and the heap is rebuilt in O(n) instead of pushing them
+        one by one. Tasks already held are re-positioned afterwards, since doing so may rebuild the heap.
+        '''
+        heap = self._heap
+        held = []
+        for task in tasks:
+            if not isinstance(task, Task):
+                raise TypeError
+            if id(task) in self._tasks:
+                held.append(task)
+                continue
+            self._tasks[id(task)] = task
+            task.addObserver(self._onTaskChanged)
+            if not task.completed:
+                entry = [self._key(task), next(self._counter), task]
+                self._entries[id(task)] = entry
+                heap.append(entry)
+        heapq.heapify(heap)
+        for task in held:
+            self.push(task)
+
+    def remove(self, task):
+        '''Removes a task from the scheduler and stops observing it'''
+        if id(task) not in self._tasks:
+            raise KeyError(task.name)
+        self._invalidate(task)
+        del self._tasks[id(task)]
+        task.removeObserver(self._onTaskChanged)
+
+    def pop(self):
+        '''Removes and returns the most urgent incomplete task
+
+        :return: a Task
+        :raises IndexError: if the scheduler holds no incomplete task
+        '''
+        task = self.peek()
+        self.remove(task)
+        return task
+
+    def peek(self):
+        '''Returns the most urgent incomplete task without removing it
+
+        :raises IndexError: if the scheduler holds no incomplete task
+        '''
+        heap = self._heap
+        while heap and heap[0][-1] is None:
+            heapq.heappop(heap)
+        if not heap:
+            raise IndexError('no incomplete tasks in scheduler')
+        return heap[0][-1]
+
+    def peekTopK(self, k):
+        '''Returns up to k of the most urgent incomplete tasks, most urgent first, without removing them; runs in
+        O(k log n)
+        '''
+        heap = self._heap
+        popped = []
+        while heap and len(popped) < k:
+            entry = heapq.heappop(heap)
+            if entry[-1] is not None:
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return [entry[-1] for entry in popped]
+
+    def _invalidate(self, task):
+        entry = self._entries.pop(id(task), None)
+        if entry is not None:
+            entry[-1] = None
+            #Rebuild once removed entries outnumber live ones so the heap does not grow without bound
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [entry for entry in self._heap if entry[-1] is not None]
+                heapq.heapify(self._heap)
+
+    def _onTaskChanged(self, task, attribute):
+        if attribute in self._REORDERING_ATTRIBUTES:
+            self.push(task)
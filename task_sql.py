@@ -0,0 +1,79 @@
+from itertools import islice
+
+from task import Task
+
+
+#Bound parameter placeholder used by the DB-API driver of each dialect
+PLACEHOLDERS = {'sqlite': '?', 'mysql': '%s'}
+
+
+def iter_batches(tasks, batch_size = 1000):
+    '''Splits an iterable of tasks into lists of at most batch_size tasks, reading only one batch at a time'''
+    if batch_size < 1:
+        raise ValueError
+    iterator = iter(tasks)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(connection, tasks, table_name, batch_size = 1000, dialect = 'sqlite', commit = True):
+    '''Inserts tasks into table_name with one executemany call per batch of bound parameters, streaming through the
+    tasks so that only one batch is held in memory at a time
+
+    :param connection: a DB-API connection, e.g. from sqlite3.connect or a MySQL driver
+    :param tasks: an iterable of Task objects
+    :param table_name: name of a table created with Task.getSQLCreateStatement
+    :param batch_size: number of rows sent per executemany call
+    :param dialect: 'sqlite' or 'mysql', selects the placeholder style and how times are stored
+    :param commit: commit the connection once all rows are written
+    :return: the number of rows inserted
+    '''
+    if dialect not in PLACEHOLDERS:
+        raise ValueError
+    statement = "INSERT INTO {} ({}) VALUES ({})".format(table_name,
+                                                         ",".join(Task.SQL_COLUMNS),
+                                                         ",".join([PLACEHOLDERS[dialect]] * len(Task.SQL_COLUMNS)))
+    cursor = connection.cursor()
+    count = 0
+    try:
+        for batch in iter_batches(tasks, batch_size):
+            cursor.executemany(statement, [task.getSQLValues(dialect) for task in batch])
+            count += len(batch)
+    finally:
+        cursor.close()
+    if commit:
+        connection.commit()
+    return count
+
+
+def insert_statements(tasks, table_name, batch_size = 1000, dialect = 'mysql'):
+    '''Generates multi-row INSERT ... VALUES (...),(...) statements with properly quoted literals, one statement per
+    batch of tasks, for clients that cannot use bound parameters (e.g. writing a SQL dump file)
+
+    :param tasks: an iterable of Task objects
+    :param table_name: name of a table created with Task.getSQLCreateStatement
+    :param batch_size: number of rows per statement
+    :param dialect: 'mysql' or 'sqlite', selects string escaping and how times are stored
+    :return: a generator of SQL statements
+    '''
+    if dialect not in PLACEHOLDERS:
+        raise ValueError
+    prefix = "INSERT INTO {} ({}) VALUES ".format(table_name, ",".join(Task.SQL_COLUMNS))
+    for batch in iter_batches(tasks, batch_size):
+        rows = ["(" + ",".join([_sqlLiteral(value, dialect) for value in task.getSQLValues(dialect)]) + ")"
+                for task in batch]
+        yield prefix + ",".join(rows) + ";"
+
+
+def _sqlLiteral(value, dialect):
+    if value is None:
+        return "NULL"
+    if isinstance(value, int):
+        return str(value)
+    value = value.replace("'", "''")
+    if dialect == 'mysql':
+        value = value.replace("\\", "\\\\")
+    return "'" + value + "'"
@@ -0,0 +1,286 @@
+from array import array
+from datetime import timedelta
+from datetime import date
+from itertools import compress
+from operator import index as _index
+
+from task import Task
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TaskTable:
+    '''A TaskTable stores a large collection of tasks column by column instead of as individual Task objects. Every
+    field accepted by Task.__init__ is kept in a typed column: durations as int64 seconds, task dates as int32 day
+    ordinals, difficulty and priority levels as int8 and the completion flag as an int8 mask. Names and descriptions
+    remain in plain lists.
+
+    Task objects are only built when a row is accessed, and they are detached copies: changing a Task returned by
+    the table does not change the row it was built from. Filtering, summing and sorting work over whole columns
+    without creating any Task objects.
+
+    When NumPy is installed, the mask* methods, take, filter and argsort run as vectorized NumPy operations over the
+    typed columns and return NumPy arrays; otherwise they loop over the column values in Python and return lists.
+    The names and descriptions are gathered per element either way.
+    '''
+
+    #Sentinels used to store None in the typed columns; levels must lie in MIN_LEVEL..MAX_LEVEL
+    NULL_LEVEL = -128
+    NULL_DATE = 0
+    MIN_LEVEL = -127
+    MAX_LEVEL = 127
+    #Range of the int64 duration columns, in seconds
+    MIN_SECONDS = -2 ** 63
+    MAX_SECONDS = 2 ** 63 - 1
+
+    def __init__(self, tasks=()):
+        self.names = []
+        self.descriptions = []
+        self.difficulty_levels = array('b')
+        self.priority_levels = array('b')
+        self.task_dates = array('i')
+        self.predicted_seconds = array('q')
+        self.actual_seconds = array('q')
+        self.completed = array('b')
+        self.extend(tasks)
+
+    @classmethod
+    def fromRows(cls, rows):
+        '''Builds a table from row tuples in the Task.toRow layout
+
+        :param rows: an iterable of row tuples
+        :return: a new TaskTable
+        '''
+        table = cls()
+        table.extendRows(rows)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, task):
+        if not isinstance(task, Task):
+            raise TypeError
+        self.appendRow(task.toRow())
+
+    def extend(self, tasks):
+        for task in tasks:
+            self.append(task)
+
+    def appendRow(self, row):
+        name, description, difficulty_level, priority_level, task_date, predicted_seconds, actual_seconds, completed = row
+        #Convert the whole row before appending anything, so that a bad row leaves the columns aligned
+        if not isinstance(name, str):
+            raise TypeError('name must be a str, not {}'.format(type(name).__name__))
+        predicted_seconds = self.storedSeconds(predicted_seconds)
+        actual_seconds = self.storedSeconds(actual_seconds)
+        difficulty_level = self.storedLevel(difficulty_level)
+        priority_level = self.storedLevel(priority_level)
+        task_date = self.NULL_DATE if task_date is None else task_date.toordinal()
+        self.names.append(name)
+        self.descriptions.append(description)
+        self.difficulty_levels.append(difficulty_level)
+        self.priority_levels.append(priority_level)
+        self.task_dates.append(task_date)
+        self.predicted_seconds.append(predicted_seconds)
+        self.actual_seconds.append(actual_seconds)
+        self.completed.append(1 if completed else 0)
+
+    @classmethod
+    def storedLevel(cls, level):
+        '''Returns the int8 value stored for a difficulty or priority level
+
+        :raises ValueError: if level is outside MIN_LEVEL..MAX_LEVEL
+        '''
+        if level is None:
+            return cls.NULL_LEVEL
+        if not cls.MIN_LEVEL <= level <= cls.MAX_LEVEL:
+            raise ValueError('level {} is outside {}..{}'.format(level, cls.MIN_LEVEL, cls.MAX_LEVEL))
+        return level
+
+    @classmethod
+    def storedSeconds(cls, seconds):
+        '''Returns the int64 value stored for a duration in seconds
+
+        :raises TypeError: if seconds is not an integer
+        :raises ValueError: if seconds is outside MIN_SECONDS..MAX_SECONDS
+        '''
+        seconds = _index(seconds)
+        if not cls.MIN_SECONDS <= seconds <= cls.MAX_SECONDS:
+            raise ValueError('{} seconds is outside the int64 range'.format(seconds))
+        return seconds
+
+    def extendRows(self, rows):
+        for row in rows:
+            self.appendRow(row)
+
+    def getRow(self, index):
+        '''Returns the row at index as a tuple in the same layout accepted by appendRow'''
+        difficulty_level = self.difficulty_levels[index]
+        priority_level = self.priority_levels[index]
+        task_date = self.task_dates[index]
+        return (self.names[index],
+                self.descriptions[index],
+                None if difficulty_level == self.NULL_LEVEL else difficulty_level,
+                None if priority_level == self.NULL_LEVEL else priority_level,
+                None if task_date == self.NULL_DATE else date.fromordinal(task_date),
+                self.predicted_seconds[index],
+                self.actual_seconds[index],
+                bool(self.completed[index]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return Task.from_row(*self.getRow(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices):
+        '''Returns a new table holding the rows at the given indices, in that order'''
+        table = TaskTable()
+        if numpy is None:
+            for source, target in self._columnPairs(table):
+                target.extend([source[i] for i in indices])
+            return table
+        if isinstance(indices, range):
+            indices = numpy.arange(indices.start, indices.stop, indices.step, dtype=numpy.intp)
+        else:
+            indices = numpy.asarray(indices, dtype=numpy.intp)
+        positions = None
+        for source, target in self._columnPairs(table):
+            if isinstance(source, array):
+                target.frombytes(_view(source)[indices].tobytes())
+            else:
+                if positions is None:
+                    positions = indices.tolist()
+                target.extend([source[i] for i in positions])
+        return table
+
+    def filter(self, mask):
+        '''Returns a new table holding the rows whose entry in mask is true
+
+        :param mask: a sequence of booleans with one entry per row, e.g. one returned by the mask* methods
+        :return: a new TaskTable
+        '''
+        if len(mask) != len(self):
+            raise ValueError
+        if numpy is not None:
+            return self.take(numpy.flatnonzero(numpy.asarray(mask, dtype=bool)))
+        table = TaskTable()
+        for source, target in self._columnPairs(table):
+            target.extend(compress(source, mask))
+        return table
+
+    def _columnPairs(self, other):
+        return ((self.names, other.names),
+                (self.descriptions, other.descriptions),
+                (self.difficulty_levels, other.difficulty_levels),
+                (self.priority_levels, other.priority_levels),
+                (self.task_dates, other.task_dates),
+                (self.predicted_seconds, other.predicted_seconds),
+                (self.actual_seconds, other.actual_seconds),
+                (self.completed, other.completed))
+
+    #Column masks, to be combined (with & and | when they are NumPy arrays) and passed to filter()
+
+    def maskCompleted(self, completed=True):
+        flag = 1 if completed else 0
+        if numpy is not None:
+            return _view(self.completed) == flag
+        return [value == flag for value in self.completed]
+
+    def maskPriorityAtLeast(self, priority_level):
+        return self._maskLevelAtLeast(self.priority_levels, priority_level)
+
+    def maskDifficultyAtLeast(self, difficulty_level):
+        return self._maskLevelAtLeast(self.difficulty_levels, difficulty_level)
+
+    def _maskLevelAtLeast(self, column, level):
+        null = self.NULL_LEVEL
+        if numpy is not None:
+            values = _view(column)
+            return (values != null) & (values >= level)
+        return [value != null and value >= level for value in column]
+
+    def maskDueBetween(self, start, end):
+        '''Mask of the rows whose task_date falls within [start, end]; rows without a date never match'''
+        first = start.toordinal()
+        last = end.toordinal()
+        if numpy is not None:
+            values = _view(self.task_dates)
+            return (values >= first) & (values <= last)
+        return [first <= value <= last for value in self.task_dates]
+
+    #Column aggregates
+
+    def totalPredictedTime(self, mask=None):
+        column = self.predicted_seconds if mask is None else compress(self.predicted_seconds, mask)
+        return timedelta(seconds=sum(column))
+
+    def totalActualTime(self, mask=None):
+        column = self.actual_seconds if mask is None else compress(self.actual_seconds, mask)
+        return timedelta(seconds=sum(column))
+
+    #Sorting
+
+    _SORT_COLUMNS = {
+        'actual_time_required': 'actual_seconds',
+        'predicted_time_required': 'predicted_seconds',
+        'task_date': 'task_dates',
+        'difficulty_level': 'difficulty_levels',
+        'priority_level': 'priority_levels',
+    }
+
+    def argsort(self, by='actual_time_required', reverse=False):
+        '''Returns the row indices that order the table by the given field. Rows whose field is None sort last.
+
+        :param by: one of actual_time_required, predicted_time_required, task_date, difficulty_level, priority_level
+        :param reverse: sort in descending order; rows with equal values keep their order either way
+        :return: the row indices, as a NumPy array when NumPy is installed and a list otherwise
+        '''
+        if by not in self._SORT_COLUMNS:
+            raise ValueError
+        column = getattr(self, self._SORT_COLUMNS[by])
+        if column is self.task_dates:
+            null = self.NULL_DATE
+        elif column is self.difficulty_levels or column is self.priority_levels:
+            null = self.NULL_LEVEL
+        else:
+            null = None
+
+        if numpy is not None:
+            values = _view(column)
+            if null is None:
+                return _stableArgsort(values, reverse)
+            present = numpy.flatnonzero(values != null)
+            missing = numpy.flatnonzero(values == null)
+            return numpy.concatenate((present[_stableArgsort(values[present], reverse)], missing))
+        if null is None:
+            return sorted(range(len(self)), key=column.__getitem__, reverse=reverse)
+        present = [i for i, value in enumerate(column) if value != null]
+        missing = [i for i, value in enumerate(column) if value == null]
+        present.sort(key=column.__getitem__, reverse=reverse)
+        return present + missing
+
+    def sorted(self, by='actual_time_required', reverse=False):
+        return self.take(self.argsort(by, reverse))
+
+
+def _view(column):
+    #A NumPy array sharing the memory of a typed column; the column cannot grow while a view of it exists, so views
+    #must not outlive the method that makes them
+    return numpy.frombuffer(column, dtype=column.typecode)
+
+
+def _stableArgsort(values, reverse):
+    '''Indices sorting values, equal values keeping their order, like sorted(..., reverse=reverse)'''
+    if not reverse:
+        return numpy.argsort(values, kind='stable')
+    #Sorting the reversed values ascending and reading the result backwards orders equal values by index
+    last = len(values) - 1
+    return last - numpy.argsort(values[::-1], kind='stable')[::-1]
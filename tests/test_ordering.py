@@ -0,0 +1,30 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from task import Task
+from benchmarks._common import make_tasks
+from benchmarks.stress_ordering import _runAsync, _sortRounds
+
+
+def test_sort_key_matches_operators():
+    tasks = make_tasks(300)
+    for field in Task.SORT_FIELDS:
+        with Task.ordering(field):
+            by_operators = sorted(tasks)
+        assert [Task.sort_key(field)(task) for task in by_operators] == \
+            sorted(Task.sort_key(field)(task) for task in tasks)
+
+
+def test_ordering_is_thread_local():
+    tasks = make_tasks(300)
+    fields = Task.SORT_FIELDS
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(_sortRounds, tasks, fields[i % len(fields)], 3, i) for i in range(8)]
+        assert sum(future.result() for future in futures) == 0
+    assert Task.sortingKey == 0 and Task.currentSortingKey() == 0
+
+
+def test_ordering_is_task_local_under_asyncio():
+    tasks = make_tasks(300)
+    assert asyncio.run(_runAsync(tasks, 8, 3)) == 0
+    assert Task.currentSortingKey() == 0
@@ -0,0 +1,27 @@
+import io
+from datetime import date
+
+from task import Task
+from task_io import render_tasks
+
+
+def test_renderings_follow_direct_assignment():
+    task = Task("a", "description", 1, 2, date(2017, 1, 1))
+    rendered = str(task)
+    statement = task.getSQLInsertStatement("tasks")
+    task.name = "b"
+    task.completed = True
+    assert str(task) != rendered and "b" in str(task)
+    assert task.getSQLInsertStatement("tasks") != statement
+    assert str(task) == "".join(task._strParts())
+
+
+def test_render_tasks_matches_renderings():
+    tasks = [Task("a", "description", 1, 2, date(2017, 1, 1)), Task("b")]
+    str(tasks[0])
+    stream = io.StringIO()
+    render_tasks(tasks, stream)
+    assert stream.getvalue() == "".join(str(task) + "\n" for task in tasks)
+    stream = io.StringIO()
+    render_tasks(tasks, stream, kind="sql", table_name="tasks")
+    assert stream.getvalue() == "".join(task.getSQLInsertStatement("tasks") + "\n" for task in tasks)
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+
+from task import Task
+from task_async import AsyncTaskStore, MemoryTaskBackend
+
+
+class RejectingBackend(MemoryTaskBackend):
+    '''Rejects every batch holding a task named "poison"'''
+
+    def writeBatch(self, items):
+        items = list(items)
+        if any(row[0] == "poison" for _, row in items):
+            raise RuntimeError("rejected")
+        super().writeBatch(items)
+
+
+def test_flusher_survives_backend_errors(caplog):
+    async def run():
+        backend = RejectingBackend()
+        store = AsyncTaskStore(backend, max_latency=0.01, retry_delay=0.01)
+        await store.start()
+        poison = await store.add(Task("poison"))
+        await asyncio.sleep(0.05)
+        fine = await store.add(Task("fine"))
+        await asyncio.sleep(0.2)
+        assert not store._flusher.done()
+        assert backend.read(fine) is not None
+        assert poison in store.failed
+        late = await store.add(Task("late"))
+        await store.close()
+        assert backend.read(late) is not None
+        assert not store._dirty
+
+    with caplog.at_level(logging.CRITICAL):
+        asyncio.run(run())
+
+
+class SlowRejectingBackend(RejectingBackend):
+    '''Rejects poison like RejectingBackend, taking a while for every single-row write'''
+
+    def writeBatch(self, items):
+        items = list(items)
+        if len(items) == 1:
+            time.sleep(0.05)
+        super().writeBatch(items)
+
+
+def test_close_during_row_by_row_retry_loses_nothing(caplog):
+    async def run():
+        backend = SlowRejectingBackend()
+        store = AsyncTaskStore(backend, max_latency=0.01, retry_delay=0.01)
+        await store.start()
+        poison = await store.add(Task("poison"))
+        fine = await store.add(Task("fine"))
+        await asyncio.sleep(0.03)  #the flusher is now writing the failed batch one row at a time
+        await store.close()
+        assert backend.read(fine) is not None
+        assert poison in store.failed
+        assert not store._dirty and not store._flushing
+
+    with caplog.at_level(logging.CRITICAL):
+        asyncio.run(run())
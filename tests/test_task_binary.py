@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from task import Task
+from task_binary import TaskFile
+
+
+def test_out_of_range_level_writes_nothing(tmp_path):
+    path = os.path.join(str(tmp_path), "tasks.bin")
+    with TaskFile.create(path, [Task("ok", "first")]) as task_file:
+        heap_size = os.path.getsize(task_file.heap_path)
+        with pytest.raises(ValueError):
+            task_file.extend([Task("bad", "never written", task_difficulty_level=300)])
+        assert len(task_file) == 1
+        assert os.path.getsize(task_file.heap_path) == heap_size
+        task_file.append(Task("next", "second"))
+        assert [(task.name, task.description) for task in task_file] == [("ok", "first"), ("next", "second")]
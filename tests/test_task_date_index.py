@@ -0,0 +1,46 @@
+import random
+from datetime import date, timedelta
+
+from task import Task
+from task_date_index import TaskDateIndex
+from benchmarks._common import make_tasks
+
+START = date(2017, 1, 1)
+
+
+def _ids(tasks):
+    return sorted(map(id, tasks))
+
+
+def test_queries_follow_completion_and_date_changes():
+    tasks = make_tasks(500, days=60) + [Task("undated")]
+    index = TaskDateIndex(tasks)
+    rng = random.Random(2)
+    for task in rng.sample(tasks, 150):
+        task.toggleCompletion()
+    for task in rng.sample(tasks, 50):
+        moved = START + timedelta(days=rng.randrange(60))
+        task.setTaskDate(moved.day, moved.month, moved.year)
+
+    today = START + timedelta(days=30)
+    first, last = START + timedelta(days=10), START + timedelta(days=20)
+    dated = [task for task in tasks if task.task_date is not None]
+    assert _ids(index.dueBetween(first, last)) == _ids(task for task in dated if first <= task.task_date <= last)
+    assert _ids(index.dueBetween(first, last, include_completed=False)) == \
+        _ids(task for task in dated if first <= task.task_date <= last and not task.completed)
+    assert _ids(index.overdue(today)) == _ids(task for task in dated if task.task_date < today and not task.completed)
+    upcoming = sorted((task for task in dated if task.task_date >= today and not task.completed),
+                      key=lambda task: task.task_date)
+    assert [task.task_date for task in index.nextDue(10, today)] == [task.task_date for task in upcoming[:10]]
+
+
+def test_incomplete_queries_skip_completed_tasks():
+    tasks = make_tasks(200, days=10)
+    for task in tasks:
+        if not task.completed:
+            task.toggleCompletion()
+    index = TaskDateIndex(tasks)
+    assert index._incomplete.days == []
+    assert list(index.overdue(START + timedelta(days=20))) == []
+    tasks[0].toggleCompletion()
+    assert list(index.overdue(START + timedelta(days=20))) == [tasks[0]]
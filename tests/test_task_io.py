@@ -0,0 +1,14 @@
+import os
+
+from task import Task
+from task_io import dump_tasks, load_tasks
+
+
+def test_dump_format_follows_file_name(tmp_path):
+    tasks = [Task("a", "description", 1, 2)]
+    for name in ("out.csv", "out.csv.gz", "out.jsonl"):
+        path = os.path.join(str(tmp_path), name)
+        dump_tasks(tasks, path)
+        assert [task.toRow() for task in load_tasks(path)] == [task.toRow() for task in tasks]
+    with open(os.path.join(str(tmp_path), "out.csv"), encoding="utf-8") as stream:
+        assert stream.readline().startswith("name,description")
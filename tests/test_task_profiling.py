@@ -0,0 +1,21 @@
+import asyncio
+
+import task_profiling
+from task import Task
+from task_async import AsyncTaskStore, MemoryTaskBackend
+
+
+def test_profile_counts_async_store_updates():
+    async def run():
+        async with AsyncTaskStore(MemoryTaskBackend()) as store:
+            task_id = await store.add(Task("t"))
+            with task_profiling.profile() as result:
+                await store.update(task_id, priority_level=3, description="d")
+                await store.complete(task_id)
+        return result
+
+    counters = asyncio.run(run()).counters
+    assert counters["setPriorityLevel"]["calls"] == 1
+    assert counters["setDescription"]["calls"] == 1
+    assert counters["toggleCompletion"]["calls"] == 1
+    assert not task_profiling.is_enabled()
@@ -0,0 +1,75 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from task import Task
+from task_repository import TaskRepository
+from task_scheduler import TaskScheduler
+from benchmarks._common import make_tasks
+
+
+def test_round_trip():
+    tasks = make_tasks(300)
+    with TaskRepository(fetch_size=7) as repository:
+        repository.addMany(tasks)
+        assert [task.toRow() for task in repository.all()] == [task.toRow() for task in tasks]
+        assert [row_id for row_id, _ in repository.items()] == list(range(1, 301))
+
+
+def test_dateless_task_round_trip():
+    with TaskRepository() as repository:
+        row_id = repository.add(Task("no date", task_priority_level=3))
+        assert repository.get(row_id).toRow() == Task("no date", task_priority_level=3).toRow()
+
+
+def test_writes_while_iterating():
+    with TaskRepository(fetch_size=100) as repository:
+        repository.addMany(make_tasks(1000))
+        seen = 0
+        for _ in repository.incomplete():
+            if seen < 5:
+                repository.add(Task("added", task_date=date(2018, 1, 1)))
+            seen += 1
+        assert repository.count() == 1005
+
+
+def test_many_open_generators_do_not_exhaust_pool():
+    with TaskRepository(pool_size=2, fetch_size=10) as repository:
+        repository.addMany(make_tasks(100))
+        generators = [iter(repository.all()) for _ in range(5)]
+        for generator in generators:
+            next(generator)
+        assert repository.count() == 100
+
+
+def _mixedTasks():
+    rng = random.Random(5)
+    return [Task("t{}".format(i), None, None, rng.choice([None, 1, 2, 9]),
+                 rng.choice([None, date(2020, 1, 1) + timedelta(days=rng.randrange(5))]), completed=rng.random() < 0.3)
+            for i in range(400)]
+
+
+@pytest.mark.parametrize("fetch_size", [1, 7, 1000])
+def test_top_priority_matches_scheduler_ordering(fetch_size):
+    tasks = _mixedTasks()
+    key = Task.sort_key(TaskScheduler.ORDERING[:2])
+    position = {id(task): index for index, task in enumerate(tasks)}
+    with TaskRepository(fetch_size=fetch_size) as repository:
+        repository.addMany(tasks)
+        for include_completed in (False, True):
+            expected = sorted((task for task in tasks if include_completed or not task.completed),
+                              key=lambda task: (key(task), position[id(task)]))
+            for n in (5, 1000):
+                assert [task.name for task in repository.top_priority(n, include_completed)] == \
+                    [task.name for task in expected[:n]]
+
+
+def test_top_priority_reads_an_index_in_order():
+    with TaskRepository() as repository:
+        with repository.connection() as connection:
+            for where in ("WHERE completed = 0 ", ""):
+                plan = connection.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM tasks {}ORDER BY priority_level DESC, task_date IS NULL, "
+                    "task_date, id LIMIT 10".format(where)).fetchall()
+                assert not any("TEMP B-TREE" in row[-1] for row in plan)
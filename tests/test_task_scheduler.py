@@ -0,0 +1,12 @@
+from task import Task
+from task_scheduler import TaskScheduler
+
+
+def test_extend_keeps_new_tasks_when_held_tasks_compact_the_heap():
+    old = [Task("old {}".format(i), task_priority_level=1) for i in range(200)]
+    scheduler = TaskScheduler(old)
+    new = [Task("new {}".format(i), task_priority_level=9) for i in range(5)]
+    #Re-pushing held tasks invalidates their entries, which compacts the heap part way through extend
+    scheduler.extend(old * 2 + new)
+    assert len(scheduler) == 205
+    assert [scheduler.pop().priority_level for _ in range(6)] == [9, 9, 9, 9, 9, 1]
@@ -0,0 +1,49 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from task import Task
+from task_sql import bulk_insert, insert_statements
+from benchmarks._common import make_tasks
+
+
+def _connect():
+    connection = sqlite3.connect(":memory:")
+    connection.execute(Task.getSQLCreateStatement("tasks", dialect="sqlite"))
+    return connection
+
+
+def _rows(connection):
+    return connection.execute("SELECT {} FROM tasks ORDER BY id".format(",".join(Task.SQL_COLUMNS))).fetchall()
+
+
+def test_bulk_insert_round_trip():
+    tasks = make_tasks(2500) + [Task("no date"), Task("empty", "", 3, None, date(2017, 2, 1))]
+    connection = _connect()
+    assert bulk_insert(connection, tasks, "tasks", batch_size=1000) == len(tasks)
+    assert _rows(connection) == [task.getSQLValues("sqlite") for task in tasks]
+
+
+def test_insert_statements_round_trip():
+    tasks = make_tasks(50) + [Task("it's \\ quoted", "O'Brien")]
+    connection = _connect()
+    for statement in insert_statements(tasks, "tasks", batch_size=20, dialect="sqlite"):
+        connection.execute(statement)
+    assert _rows(connection) == [task.getSQLValues("sqlite") for task in tasks]
+
+
+def test_bulk_insert_rejects_unknown_dialect():
+    with pytest.raises(ValueError):
+        bulk_insert(_connect(), [], "tasks", dialect="postgres")
+
+
+def test_mysql_time_format():
+    task = Task("t", predicted_time_required=timedelta(hours=30, seconds=5))
+    assert task.getSQLValues("mysql")[5] == "30:00:05"
+
+
+def test_mysql_time_format_of_negative_durations():
+    task = Task("t", predicted_time_required=timedelta(seconds=-1),
+                actual_time_required=timedelta(hours=-25, seconds=-61))
+    assert task.getSQLValues("mysql")[5:7] == ("-0:00:01", "-25:01:01")
@@ -0,0 +1,96 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import task_table
+from task import Task
+from task_table import TaskTable
+
+
+def _assertAligned(table):
+    lengths = {len(column) for column, _ in table._columnPairs(TaskTable())}
+    assert lengths == {len(table)}
+
+
+@pytest.mark.parametrize("level", [200, -128])
+def test_out_of_range_level_leaves_table_aligned(level):
+    table = TaskTable([Task("ok")])
+    with pytest.raises(ValueError):
+        table.append(Task("bad", task_priority_level=level))
+    _assertAligned(table)
+    assert len(table) == 1 and table[0].name == "ok"
+
+
+@pytest.mark.parametrize("row, error", [
+    (("x", None, 1, 1, None, 1.5, 0, False), TypeError),
+    (("x", None, 1, 1, None, 0, "7", False), TypeError),
+    (("x", None, 1, 1, None, 2 ** 63, 0, False), ValueError),
+    ((None, None, 1, 1, None, 0, 0, False), TypeError),
+])
+def test_bad_row_leaves_table_aligned(row, error):
+    table = TaskTable([Task("ok")])
+    with pytest.raises(error):
+        table.appendRow(row)
+    _assertAligned(table)
+    assert table.getRow(0)[0] == "ok"
+
+
+def _randomTable(size, seed=1):
+    rng = random.Random(seed)
+    levels = [None, -3, 0, 2, 2, 5]
+    table = TaskTable()
+    for i in range(size):
+        task_date = rng.choice([None, date(2024, 1, 1) + timedelta(days=rng.randrange(30))])
+        table.appendRow(("t{}".format(i), rng.choice([None, "d"]), rng.choice(levels), rng.choice(levels), task_date,
+                         rng.randrange(5) * 60, rng.randrange(5) * 60, rng.random() < 0.3))
+    return table
+
+
+def _rows(table):
+    return [table.getRow(i) for i in range(len(table))]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(task_table, "numpy", None)
+    elif task_table.numpy is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("by", sorted(TaskTable._SORT_COLUMNS))
+@pytest.mark.parametrize("reverse", [False, True])
+def test_argsort_matches_stable_sort_with_nulls_last(backend, by, reverse):
+    table = _randomTable(300)
+    tasks = list(table)
+    present = [i for i, task in enumerate(tasks) if getattr(task, by) is not None]
+    missing = [i for i, task in enumerate(tasks) if getattr(task, by) is None]
+    expected = sorted(present, key=lambda i: getattr(tasks[i], by), reverse=reverse) + missing
+    assert list(table.argsort(by, reverse)) == expected
+    assert _rows(table.sorted(by, reverse)) == [table.getRow(i) for i in expected]
+
+
+def test_masks_filter_and_take(backend):
+    table = _randomTable(200)
+    rows = _rows(table)
+    start, end = date(2024, 1, 5), date(2024, 1, 20)
+    expected = [row for row in rows if row[7] and row[3] is not None and row[3] >= 2
+                and row[4] is not None and start <= row[4] <= end]
+    masks = [table.maskCompleted(), table.maskPriorityAtLeast(2), table.maskDueBetween(start, end)]
+    mask = [all(values) for values in zip(*masks)]
+    assert _rows(table.filter(mask)) == expected
+    assert list(table.maskDifficultyAtLeast(200)) == [False] * len(table)
+    assert _rows(table.take([-1, 0, 5, 0])) == [rows[-1], rows[0], rows[5], rows[0]]
+    assert _rows(table[10:2:-3]) == rows[10:2:-3]
+    _assertAligned(table.take([]))
+
+
+def test_table_grows_after_vectorized_ops(backend):
+    table = _randomTable(20)
+    table.filter(table.maskCompleted(False))
+    table.argsort('task_date', reverse=True)
+    table.append(Task("later"))
+    _assertAligned(table)
+    assert table[-1].name == "later"